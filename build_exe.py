@@ -3,50 +3,85 @@ Build script for creating standalone .exe using PyInstaller
 """
 
 import PyInstaller.__main__
+import argparse
+import json
 import os
+import subprocess
 import sys
 
+parser = argparse.ArgumentParser(description='Build ScreenTranslator with PyInstaller')
+parser.add_argument('--mode', choices=['onedir', 'onefile'], default='onedir',
+                    help='onedir (default, fast startup) or onefile (single exe, '
+                         'unpacks to a temp folder on every launch)')
+parser.add_argument('--sfx', action='store_true',
+                    help='Also pack the output folder into a 7-Zip self-extracting archive (onedir only)')
+parser.add_argument('--upx-dir', default=os.environ.get('UPX_DIR', r'C:\tools\upx'),
+                    help='Folder containing upx.exe used to compress DLLs (default: %%UPX_DIR%% or C:\\tools\\upx)')
+cli_args = parser.parse_args()
+if cli_args.sfx and cli_args.mode != 'onedir':
+    parser.error('--sfx can only be used with --mode onedir')
+
 # Get the absolute path to the project directory
 project_dir = os.path.dirname(os.path.abspath(__file__))
 src_dir = os.path.join(project_dir, 'src')
 
+# Read the bundled config to decide which translation backend to ship
+try:
+    with open(os.path.join(project_dir, 'config.json'), 'r', encoding='utf-8') as f:
+        config = json.load(f)
+except Exception:
+    config = {}
+translation_engine = config.get('translation_engine', 'google')
+
+# Hidden imports (modules that PyInstaller might miss)
+hidden = [
+    'PyQt6.QtCore',
+    'PyQt6.QtGui',
+    'PyQt6.QtWidgets',
+    'mss',
+    'cv2',
+    'numpy',
+    'pytesseract',  # OCR engine is always required
+    # OCR hands Tesseract PIL images (pytesseract, and the tesserocr path in
+    # ocr_engine.py); Gemini vision encodes with cv2 and needs no PIL
+    'PIL',
+    'PIL.Image',
+]
+
+if translation_engine == 'gemini':
+    # Gemini; Google Translate stays as backup
+    hidden += ['google.generativeai', 'deep_translator']
+else:
+    hidden += ['deep_translator']
+
+# Exclude unnecessary modules to reduce size and unpack time
+excludes = [
+    'matplotlib', 'scipy', 'pandas',
+    'tkinter', 'PyQt5', 'PySide6',
+    'pytest', 'setuptools', 'pip',
+    'IPython', 'notebook', 'jupyter',
+    'torch', 'tensorflow', 'sympy',
+    'PIL.ImageQt',
+]
+
 # PyInstaller arguments
 args = [
     os.path.join(src_dir, 'main.py'),  # Main script
     '--name=ScreenTranslator',  # Name of the executable
     '--windowed',  # No console window (GUI app)
-    '--onedir',  # Create a directory instead of single file (better for large dependencies)
+    f'--{cli_args.mode}',  # onedir: directory instead of single file (better for large dependencies)
     '--icon=NONE',  # No icon (you can add one later)
     
-    # Add paths to search for imports
+    # Add paths to search for imports (modules are bundled as compiled
+    # bytecode by the analysis, so src/ is not copied as data)
     f'--paths={src_dir}',
     
+    # Bundle every UI module up front (several are imported lazily)
+    '--collect-submodules=ui',
+    
     # Add data files
     f'--add-data={os.path.join(project_dir, "config.json")};.',
     
-    # Add source modules
-    f'--add-data={src_dir};src',
-    
-    # Hidden imports (modules that PyInstaller might miss)
-    '--hidden-import=PyQt6.QtCore',
-    '--hidden-import=PyQt6.QtGui',
-    '--hidden-import=PyQt6.QtWidgets',
-    '--hidden-import=PIL',
-    '--hidden-import=PIL.Image',
-    '--hidden-import=cv2',
-    '--hidden-import=numpy',
-    '--hidden-import=pytesseract',
-    '--hidden-import=deep_translator',
-    '--hidden-import=google.generativeai',
-    '--hidden-import=mss',
-    '--hidden-import=multiprocessing',
-    '--hidden-import=queue',
-    
-    # Exclude unnecessary modules to reduce size
-    '--exclude-module=matplotlib',
-    '--exclude-module=scipy',
-    '--exclude-module=pandas',
-    
     # Build directory
     '--distpath=dist',
     '--workpath=build',
@@ -57,13 +92,42 @@ args = [
     
     # No confirmation prompts
     '--noconfirm',
+    
+    # Compile bundled modules with -OO (strip asserts and docstrings)
+    '--optimize=2',
 ]
 
+if os.path.isdir(cli_args.upx_dir):
+    # Compress Qt/OpenCV DLLs with UPX to cut first-launch disk reads.
+    # These must stay unpacked: the VC runtime (Windows loader), the Qt
+    # platform plugin (crashes when packed) and the Python DLL (signature check)
+    args += [
+        f'--upx-dir={cli_args.upx_dir}',
+        '--upx-exclude=vcruntime140.dll',
+        '--upx-exclude=qwindows.dll',
+        '--upx-exclude=python3.dll',
+        f'--upx-exclude=python{sys.version_info.major}{sys.version_info.minor}.dll',
+    ]
+    # UPX reads its default options from the UPX environment variable
+    os.environ.setdefault('UPX', '--best --lzma')
+
+if cli_args.mode == 'onedir':
+    # Keep .pyc files on disk instead of in the PYZ archive so they are
+    # loaded lazily on first import (only runtime __file__ use is dirname())
+    args.append('--noarchive')
+
+args += ['--hidden-import=' + m for m in hidden]
+args += ['--exclude-module=' + m for m in excludes]
+
 print("=" * 60)
-print("Building ScreenTranslator (Directory Mode)")
+print(f"Building ScreenTranslator ({'Directory' if cli_args.mode == 'onedir' else 'Single File'} Mode)")
+if cli_args.mode == 'onefile':
+    print("⚠ Onefile builds extract to a temp folder on every launch (slow startup)")
 print("=" * 60)
 print(f"Project directory: {project_dir}")
 print(f"Source directory: {src_dir}")
+print(f"Translation engine: {translation_engine}")
+print(f"UPX: {cli_args.upx_dir if os.path.isdir(cli_args.upx_dir) else 'not found (DLLs left uncompressed)'}")
 print()
 
 # Run PyInstaller
@@ -71,7 +135,11 @@ PyInstaller.__main__.run(args)
 
 # Post-build: Copy Tesseract-OCR to dist folder
 import shutil
-dist_dir = os.path.join(project_dir, 'dist', 'ScreenTranslator')
+if cli_args.mode == 'onedir':
+    dist_dir = os.path.join(project_dir, 'dist', 'ScreenTranslator')
+else:
+    # Tesseract is looked up next to the executable
+    dist_dir = os.path.join(project_dir, 'dist')
 tess_dst = os.path.join(dist_dir, 'Tesseract-OCR')
 
 # Try local project copy first
@@ -97,6 +165,18 @@ else:
     print("⚠ Tesseract-OCR directory not found!")
     print("  Please copy 'C:\\Program Files\\Tesseract-OCR' to the dist folder manually.")
 
+# Optional: wrap the folder in a self-extracting archive so users still get a
+# single download, but only pay the extraction cost once instead of on every launch
+sfx_path = os.path.join(project_dir, 'dist', 'ScreenTranslator.exe')
+if cli_args.sfx:
+    print(f"Creating self-extracting archive {sfx_path}...")
+    try:
+        subprocess.run(['7z', 'a', '-sfx', sfx_path, dist_dir], check=True)
+        print("✓ Self-extracting archive created")
+    except (OSError, subprocess.CalledProcessError) as e:
+        print(f"⚠ Could not create self-extracting archive: {e}")
+        print("  Make sure 7-Zip (7z) is installed and on PATH.")
+
 print()
 print("=" * 60)
 print("Build complete!")
@@ -104,7 +184,16 @@ print("=" * 60)
 print(f"Output directory: {dist_dir}")
 print()
 print("DISTRIBUTION INSTRUCTIONS:")
-print("1. Zip the entire 'ScreenTranslator' folder inside 'dist'")
-print("2. Send the Zip file to users")
-print("3. Users just need to unzip and run ScreenTranslator.exe")
+if cli_args.sfx:
+    print(f"1. Send {sfx_path} to users")
+    print("2. Users run it once to extract the 'ScreenTranslator' folder")
+    print("3. Then run ScreenTranslator.exe from the extracted folder")
+elif cli_args.mode == 'onefile':
+    print("1. Zip ScreenTranslator.exe together with the 'Tesseract-OCR' folder inside 'dist'")
+    print("2. Send the Zip file to users")
+    print("3. Users just need to unzip and run ScreenTranslator.exe")
+else:
+    print("1. Zip the entire 'ScreenTranslator' folder inside 'dist'")
+    print("2. Send the Zip file to users")
+    print("3. Users just need to unzip and run ScreenTranslator.exe")
 print("=" * 60)
@@ -1,10 +1,11 @@
 """
 Script to list available Gemini models
 """
-import google.generativeai as genai
+import functools
 import json
 import os
 
+@functools.lru_cache(maxsize=None)
 def load_api_key():
     try:
         with open('config.json', 'r', encoding='utf-8') as f:
@@ -19,6 +20,9 @@ def list_models():
         print("Error: API key not found in config.json")
         return
 
+    # Imported here: google.generativeai pulls in grpc/protobuf (~0.5 s)
+    import google.generativeai as genai
+
     try:
         genai.configure(api_key=api_key)
         print("Listing available models...")
@@ -5,6 +5,29 @@ Allows users to set Gemini API key and custom translation prompt
 
 import json
 import os
+import sys
+
+BANNER = """\
+{rule}
+Screen Translator - Configuration
+{rule}
+
+Current settings:
+1. Translation Engine: {engine}
+2. Gemini API Key: {api_key_mask}
+3. Custom Prompt: {custom_prompt}
+4. Source Language: {source_lang}
+5. Target Language: {target_lang}
+
+{rule}
+What would you like to configure?
+{rule}
+1. Set Gemini API Key
+2. Set Custom Translation Prompt
+3. Choose Translation Engine (google/gemini)
+4. Set Source/Target Languages
+0. Exit
+"""
 
 def load_config():
     """Load current configuration"""
@@ -27,27 +50,16 @@ def save_config(config):
     print("\n✓ Configuration saved!")
 
 def main():
-    print("="*60)
-    print("Screen Translator - Configuration")
-    print("="*60)
-    
     config = load_config()
     
-    print("\nCurrent settings:")
-    print(f"1. Translation Engine: {config.get('translation_engine', 'google')}")
-    print(f"2. Gemini API Key: {'*' * 20 if config.get('gemini_api_key') else '(not set)'}")
-    print(f"3. Custom Prompt: {config.get('custom_prompt', '')}")
-    print(f"4. Source Language: {config.get('source_lang', 'en')}")
-    print(f"5. Target Language: {config.get('target_lang', 'vi')}")
-    
-    print("\n" + "="*60)
-    print("What would you like to configure?")
-    print("="*60)
-    print("1. Set Gemini API Key")
-    print("2. Set Custom Translation Prompt")
-    print("3. Choose Translation Engine (google/gemini)")
-    print("4. Set Source/Target Languages")
-    print("0. Exit")
+    sys.stdout.write(BANNER.format(
+        rule="=" * 60,
+        engine=config.get('translation_engine', 'google'),
+        api_key_mask='*' * 20 if config.get('gemini_api_key') else '(not set)',
+        custom_prompt=config.get('custom_prompt', ''),
+        source_lang=config.get('source_lang', 'en'),
+        target_lang=config.get('target_lang', 'vi'),
+    ))
     
     choice = input("\nYour choice: ").strip()
     
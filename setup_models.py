@@ -74,50 +74,95 @@ def setup_models(source_lang="en", target_lang="vi"):
     print(f"\n2. Downloading and converting model...")
     print(f"   This may take several minutes...")
     
+    # Use int8 quantization for smaller size and faster inference
+    # (int8 weights + fp16 activations when a CUDA GPU is available)
+    quantization = "int8"
     try:
-        cmd = [
-            "ct2-transformers-converter",
-            "--model", model_name,
-            "--output_dir", str(models_dir),
-            "--quantization", "int8",  # Use int8 quantization for smaller size and faster inference
-            "--force"
-        ]
+        import torch
+        if torch.cuda.is_available():
+            quantization = "int8_float16"
+    except ImportError:
+        pass
+    
+    # Download and disk failures inside the in-process converter
+    # (huggingface_hub raises requests or httpx errors, depending on its version)
+    download_errors = (OSError,)
+    try:
+        import requests
+        download_errors += (requests.RequestException,)
+    except ImportError:
+        pass
+    try:
+        import httpx
+        download_errors += (httpx.HTTPError,)
+    except ImportError:
+        pass
+    
+    try:
+        try:
+            # Convert in-process: avoids starting a new interpreter that
+            # re-imports transformers/torch/ctranslate2
+            from ctranslate2.converters import TransformersConverter
+        except ImportError:
+            TransformersConverter = None
         
-        print(f"\n   Running: {' '.join(cmd)}\n")
-        subprocess.check_call(cmd)
+        if TransformersConverter is not None:
+            print(f"\n   Converting {model_name} (quantization: {quantization})\n")
+            TransformersConverter(model_name).convert(str(models_dir), quantization=quantization, force=True)
+        else:
+            # Very old ctranslate2 versions only ship the CLI converter
+            cmd = [
+                "ct2-transformers-converter",
+                "--model", model_name,
+                "--output_dir", str(models_dir),
+                "--quantization", quantization,
+                "--force"
+            ]
+            
+            print(f"\n   Running: {' '.join(cmd)}\n")
+            subprocess.check_call(cmd)
         
         print("\n   ✓ Model downloaded and converted successfully!")
         
-    except subprocess.CalledProcessError as e:
+    except (subprocess.CalledProcessError, ImportError, ValueError, RuntimeError) as e:
         print(f"\n   ✗ Error converting model: {e}")
         print("\n   You may need to install transformers:")
         print("   pip install transformers")
         return
-    except FileNotFoundError:
+    except FileNotFoundError as e:
+        if TransformersConverter is not None:
+            print(f"\n   ✗ Error saving model: {e}")
+            return
         print("\n   ✗ ct2-transformers-converter not found!")
         print("\n   Please install it with:")
         print("   pip install ctranslate2")
         return
+    except download_errors as e:
+        print(f"\n   ✗ Error downloading or saving model: {e}")
+        print("\n   Check your internet connection and free disk space,")
+        print("   then run this script again.")
+        return
     
-    # Verify model files
+    # Verify model files (one directory scan instead of a stat per file)
     print("\n3. Verifying model files...")
     required_files = ["model.bin", "config.json"]
+    optional_files = ["sentencepiece.model", "source.spm", "target.spm"]
     
+    sizes = {entry.name: entry.stat().st_size for entry in os.scandir(models_dir)}
+    
+    report = []
     for file in required_files:
-        file_path = models_dir / file
-        if file_path.exists():
-            size = file_path.stat().st_size / (1024 * 1024)  # MB
-            print(f"   ✓ {file} ({size:.2f} MB)")
+        if file in sizes:
+            report.append(f"   ✓ {file} ({sizes[file] / (1024 * 1024):.2f} MB)")
         else:
-            print(f"   ✗ {file} not found!")
+            report.append(f"   ✗ {file} not found!")
     
     # Check for optional files
-    optional_files = ["sentencepiece.model", "source.spm", "target.spm"]
     for file in optional_files:
-        file_path = models_dir / file
-        if file_path.exists():
-            size = file_path.stat().st_size / (1024 * 1024)  # MB
-            print(f"   ✓ {file} ({size:.2f} MB)")
+        if file in sizes:
+            report.append(f"   ✓ {file} ({sizes[file] / (1024 * 1024):.2f} MB)")
+    
+    sys.stdout.write("\n".join(report) + "\n")
     
     print("\n" + "=" * 60)
     print("✓ Model setup complete!")
@@ -4,14 +4,9 @@ For testing without OCR/Translation dependencies
 """
 
 import sys
-import multiprocessing as mp
-from multiprocessing import Queue
 from PyQt6.QtWidgets import QApplication, QSystemTrayIcon, QMenu, QMessageBox
 from PyQt6.QtCore import Qt
 from PyQt6.QtGui import QIcon, QAction, QPixmap, QPainter
-import mss
-import cv2
-import numpy as np
 
 # Import UI components
 sys.path.insert(0, 'src')
@@ -33,6 +28,7 @@ class SimpleScreenTranslatorApp:
         self.snipping_widget = None
         
         # Screen capture
+        import mss
         self.sct = mss.mss()
         
         # Create system tray icon
@@ -105,6 +101,10 @@ class SimpleScreenTranslatorApp:
         
         # Capture the region
         try:
+            # Imported here: only needed once the user actually captures
+            import cv2
+            import numpy as np
+            
             monitor = {
                 "top": y,
                 "left": x,
@@ -113,8 +113,12 @@ class SimpleScreenTranslatorApp:
             }
             
             screenshot = self.sct.grab(monitor)
-            img = np.array(screenshot)
-            img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            # Zero-copy view over the BGRA bytes owned by mss
+            img = np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+                screenshot.height, screenshot.width, 4
+            )
+            # Drop the alpha channel with a slice instead of cvtColor(BGRA2BGR)
+            img_bgr = np.ascontiguousarray(img[:, :, :3])
             
             # Save the captured image
             filename = f"capture_{x}_{y}_{width}x{height}.png"
@@ -170,8 +174,6 @@ class SimpleScreenTranslatorApp:
 
 def main():
     """Main entry point"""
-    mp.freeze_support()
-    
     print("=" * 60)
     print("Screen Translator - Simple Mode")
     print("=" * 60)
@@ -189,4 +191,8 @@ def main():
 
 
 if __name__ == '__main__':
+    # Required for multiprocessing on Windows; must run before anything else
+    # so frozen child processes exit without printing the banner
+    import multiprocessing as mp
+    mp.freeze_support()
     main()
@@ -4,8 +4,61 @@ Screen capture module using mss for fast, cross-platform screen capture
 
 import numpy as np
 import mss
+import sys
+import threading
+import logging
 from typing import Tuple, Optional
-import cv2
+
+logger = logging.getLogger(__name__)
+
+# Mean absolute difference (0-255) below which two page thumbnails are
+# considered identical
+PAGE_DIFF_THRESHOLD = 2.0
+
+# Win32 input constants
+VK_NEXT = 0x22  # Page Down
+KEYEVENTF_KEYUP = 0x0002
+MOUSEEVENTF_LEFTDOWN = 0x0002
+MOUSEEVENTF_LEFTUP = 0x0004
+
+# Per-thread mss instances: an mss connection must not be shared across
+# threads, but every ScreenCapture on the same thread can use one
+_tls = threading.local()
+
+
+def _get_sct():
+    """Return this thread's mss instance, creating it on first use"""
+    sct = getattr(_tls, 'sct', None)
+    if sct is None:
+        sct = _tls.sct = mss.mss()
+    return sct
+
+
+def _send_pagedown():
+    """Press Page Down (Win32 keybd_event, pyautogui on other platforms)"""
+    if sys.platform == 'win32':
+        import ctypes
+        user32 = ctypes.windll.user32
+        user32.keybd_event(VK_NEXT, 0, 0, 0)
+        user32.keybd_event(VK_NEXT, 0, KEYEVENTF_KEYUP, 0)
+    else:
+        import pyautogui
+        pyautogui.press('pagedown')
+
+
+def _click(x: int, y: int):
+    """Left click at screen coordinates (Win32 mouse_event, pyautogui on other platforms)"""
+    if sys.platform == 'win32':
+        import ctypes
+        user32 = ctypes.windll.user32
+        user32.SetCursorPos(x, y)
+        user32.mouse_event(MOUSEEVENTF_LEFTDOWN, 0, 0, 0, 0)
+        user32.mouse_event(MOUSEEVENTF_LEFTUP, 0, 0, 0, 0)
+    else:
+        import pyautogui
+        # Disable fail-safe to prevent corner detection issues
+        pyautogui.FAILSAFE = False
+        pyautogui.click(x, y)
 
 
 class ScreenCapture:
@@ -16,9 +69,21 @@ class ScreenCapture:
     
     def __init__(self):
         """Initialize the screen capture engine"""
-        self.sct = mss.mss()
+        # Output buffers reused across captures (see reuse_buffer)
+        self._buffers = {}
+    
+    @property
+    def sct(self):
+        """
+        mss instance of the calling thread. It is kept alive between grabs:
+        on Windows it holds the GDI device contexts and reuses its bitmap/DIB
+        buffer while consecutive grabs have the same size (e.g. every page of
+        a scrolling capture).
+        """
+        return _get_sct()
     
-    def capture_region(self, x: int, y: int, width: int, height: int) -> Optional[np.ndarray]:
+    def capture_region(self, x: int, y: int, width: int, height: int,
+                       grayscale: bool = False, reuse_buffer: bool = False) -> Optional[np.ndarray]:
         """
         Capture a specific region of the screen.
         
@@ -27,9 +92,15 @@ class ScreenCapture:
             y: Y coordinate of top-left corner
             width: Width of the region
             height: Height of the region
+            grayscale: Return a single-channel image (converted straight from BGRA)
+            reuse_buffer: Write into a buffer owned by this object instead of
+                allocating a new array. The result is overwritten by the next
+                reuse_buffer capture, so only use it when the image is fully
+                processed before capturing again.
             
         Returns:
-            numpy.ndarray: BGR image array (OpenCV format) or None if capture fails
+            numpy.ndarray: BGR image array (OpenCV format), or grayscale array
+            if grayscale=True, or None if capture fails
         """
         try:
             # Define the region to capture
@@ -43,13 +114,21 @@ class ScreenCapture:
             # Capture the screen region
             screenshot = self.sct.grab(monitor)
             
-            # Convert to numpy array (BGRA format from mss)
-            img = np.array(screenshot)
+            # Wrap the BGRA pixels from mss without copying
+            img = self._bgra_view(screenshot)
             
-            # Convert BGRA to BGR (remove alpha channel for OCR)
-            img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
+            if grayscale:
+                import cv2
+                dst = self._reusable_buffer('gray', img.shape[:2]) if reuse_buffer else None
+                return cv2.cvtColor(img, cv2.COLOR_BGRA2GRAY, dst=dst)
             
-            return img_bgr
+            # Drop the alpha channel for OCR. Slicing + one contiguous copy is
+            # cheaper than cv2.cvtColor(BGRA2BGR), which also shuffles channels.
+            if reuse_buffer:
+                out = self._reusable_buffer('bgr', img.shape[:2] + (3,))
+                np.copyto(out, img[:, :, :3])
+                return out
+            return np.ascontiguousarray(img[:, :, :3])
             
         except Exception as e:
             print(f"Error capturing screen region: {e}")
@@ -72,11 +151,9 @@ class ScreenCapture:
             # Capture the screen
             screenshot = self.sct.grab(monitor)
             
-            # Convert to numpy array and BGR format
-            img = np.array(screenshot)
-            img_bgr = cv2.cvtColor(img, cv2.COLOR_BGRA2BGR)
-            
-            return img_bgr
+            # Wrap the BGRA pixels and convert to BGR format
+            img = self._bgra_view(screenshot)
+            return np.ascontiguousarray(img[:, :, :3])
             
         except Exception as e:
             print(f"Error capturing full screen: {e}")
@@ -94,13 +171,9 @@ class ScreenCapture:
             Stitched image
         """
         try:
-            import pyautogui
             import time
             from stitcher import ImageStitcher
             
-            # Disable fail-safe to prevent corner detection issues
-            pyautogui.FAILSAFE = False
-            
             print(f"Starting scrolling capture (max {max_pages} pages)...")
             
             # Click to focus the window under the cursor (center of region)
@@ -111,37 +184,45 @@ class ScreenCapture:
                 # Click at a safe position (not too close to edges)
                 click_x = x + min(50, width // 4)
                 click_y = y + min(50, height // 4)
-                pyautogui.click(click_x, click_y)
+                _click(click_x, click_y)
                 time.sleep(0.5)
             except Exception as e:
                 print(f"Could not focus window: {e}")
             
-            captured_images = []
             identical_count = 0  # Track consecutive identical images
             
             # Capture first page
             first_page = self.capture_region(x, y, width, height)
             if first_page is None:
                 return None
-            captured_images.append(first_page)
+            
+            # Match each page against the previous one as it arrives and keep
+            # a copy of only its new rows (a slice would keep the whole frame
+            # alive), so memory grows with the new content rather than with
+            # pages x frame size
+            strips = [first_page]
+            prev_gray = ImageStitcher.to_gray(first_page)
+            page_count = 1
+            prev_thumb = self._page_thumbnail(first_page)
             
             for i in range(max_pages - 1):
                 # Scroll down
-                pyautogui.press('pagedown')
-                time.sleep(0.8) # Wait for scroll animation
+                _send_pagedown()
                 
-                # Capture next page
-                next_page = self.capture_region(x, y, width, height)
+                # Capture next page as soon as the scroll animation settles
+                next_page, curr_thumb = self._wait_for_scroll(x, y, width, height, prev_thumb)
                 if next_page is None:
                     break
                 
-                # Check if we reached the bottom using MSE (Mean Squared Error)
-                # This is more robust than exact equality
-                mse = np.mean((next_page.astype(float) - captured_images[-1].astype(float)) ** 2)
+                # Check if we reached the bottom by comparing 8x downsampled pages
+                # (mean absolute difference on uint8 instead of a full-size float MSE)
+                # The previous page's thumbnail is kept from the last iteration
+                diff = self._page_difference(curr_thumb, prev_thumb)
+                prev_thumb = curr_thumb
                 
-                if mse < 10.0:  # Very similar images (threshold can be adjusted)
+                if diff < PAGE_DIFF_THRESHOLD:  # Very similar images (threshold can be adjusted)
                     identical_count += 1
-                    print(f"Page {i+2}: Similar to previous (MSE: {mse:.2f}), count: {identical_count}")
+                    logger.debug("Page %d: similar to previous (diff: %.2f), count: %d", i + 2, diff, identical_count)
                     
                     # Stop if we get 2 consecutive identical images
                     if identical_count >= 2:
@@ -149,15 +230,15 @@ class ScreenCapture:
                         break
                 else:
                     identical_count = 0  # Reset counter
-                    print(f"Page {i+2}: New content detected (MSE: {mse:.2f})")
+                    logger.debug("Page %d: new content detected (diff: %.2f)", i + 2, diff)
                 
-                captured_images.append(next_page)
-            
-            print(f"Captured {len(captured_images)} pages. Stitching...")
+                gray = ImageStitcher.to_gray(next_page)
+                strips.append(next_page[ImageStitcher.find_overlap(prev_gray, gray):].copy())
+                prev_gray = gray
+                page_count += 1
             
-            # Stitch images
-            result = ImageStitcher.stitch_images(captured_images)
-            return result
+            print(f"Captured and stitched {page_count} pages.")
+            return np.concatenate(strips) if len(strips) > 1 else first_page
             
         except ImportError:
             print("pyautogui or stitcher not found. Please install requirements.")
@@ -166,6 +247,72 @@ class ScreenCapture:
             print(f"Error in scrolling capture: {e}")
             return None
 
+    def _wait_for_scroll(self, x: int, y: int, width: int, height: int, prev_thumb: np.ndarray,
+                         timeout: float = 1.0, interval: float = 0.05) -> Tuple[Optional[np.ndarray], Optional[np.ndarray]]:
+        """
+        Poll the region after a scroll until its content stops moving.
+        
+        The frame is considered settled once it differs from the page before the
+        scroll and two consecutive polls match. If the content never moves (end of
+        page) the last frame is returned after the timeout.
+        
+        Returns:
+            (page, thumbnail) of the settled frame, or (None, None) if capture fails
+        """
+        import time
+        
+        deadline = time.monotonic() + timeout
+        last_thumb = None
+        
+        while True:
+            time.sleep(interval)
+            page = self.capture_region(x, y, width, height)
+            if page is None:
+                return None, None
+            thumb = self._page_thumbnail(page)
+            
+            moved = self._page_difference(thumb, prev_thumb) >= PAGE_DIFF_THRESHOLD
+            if moved and last_thumb is not None and \
+                    self._page_difference(thumb, last_thumb) < PAGE_DIFF_THRESHOLD:
+                return page, thumb
+            if time.monotonic() >= deadline:
+                return page, thumb
+            last_thumb = thumb
+    
+    def _reusable_buffer(self, name: str, shape: Tuple[int, ...]) -> np.ndarray:
+        """
+        Contiguous uint8 array of the given shape backed by a buffer that is
+        kept between calls and only reallocated when a larger size is needed.
+        """
+        size = int(np.prod(shape))
+        buf = self._buffers.get(name)
+        if buf is None or buf.size < size:
+            buf = np.empty(size, dtype=np.uint8)
+            self._buffers[name] = buf
+        return buf[:size].reshape(shape)
+    
+    @staticmethod
+    def _bgra_view(screenshot) -> np.ndarray:
+        """Zero-copy (height, width, 4) view over the raw BGRA buffer of an mss screenshot"""
+        return np.frombuffer(screenshot.raw, dtype=np.uint8).reshape(
+            screenshot.height, screenshot.width, 4
+        )
+    
+    @staticmethod
+    def _page_thumbnail(image: np.ndarray) -> np.ndarray:
+        """8x downsampled copy of a page, used for cheap page comparisons"""
+        import cv2
+        
+        return cv2.resize(image, (0, 0), fx=0.125, fy=0.125, interpolation=cv2.INTER_AREA)
+    
+    @staticmethod
+    def _page_difference(thumb1: np.ndarray, thumb2: np.ndarray) -> float:
+        """Mean absolute pixel difference between two page thumbnails"""
+        import cv2
+        
+        diff = cv2.absdiff(thumb1, thumb2)
+        return int(diff.sum()) / diff.size
+
     def get_monitor_info(self) -> list:
         """
         Get information about all available monitors.
@@ -177,8 +324,10 @@ class ScreenCapture:
     
     def close(self):
         """Clean up resources"""
-        if self.sct:
-            self.sct.close()
+        sct = getattr(_tls, 'sct', None)
+        if sct is not None:
+            sct.close()
+            _tls.sct = None
     
     def __enter__(self):
         """Context manager entry"""
@@ -0,0 +1,43 @@
+"""
+Shared loader for config.json
+"""
+
+import json
+import os
+from typing import Dict, Any
+
+# config.json in the project root
+CONFIG_PATH = os.path.join(os.path.dirname(__file__), '..', 'config.json')
+
+# Per-user directory for files the app can regenerate (tray icon, translations)
+CACHE_DIR = os.path.join(os.environ.get('APPDATA', os.path.expanduser('~/.cache')), 'screentrans')
+
+# path -> ((mtime_ns, size), parsed config)
+_cache = {}
+
+
+def load_config(path: str = CONFIG_PATH) -> Dict[str, Any]:
+    """
+    Load a JSON config file, parsing it again only when it changed on disk.
+
+    Args:
+        path: Path to the config file (default: config.json in the project root)
+
+    Returns:
+        Parsed config. The dict is shared between callers, so treat it as
+        read-only. Empty dict if the file does not exist.
+    """
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return {}
+
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _cache.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    with open(path, 'r', encoding='utf-8') as f:
+        config = json.load(f)
+    _cache[path] = (stamp, config)
+    return config
@@ -4,36 +4,34 @@ Main entry point for Screen Translator application
 
 import sys
 import os
+import logging
 import multiprocessing as mp
 from multiprocessing import Queue
 from PyQt6.QtWidgets import (QApplication, QSystemTrayIcon, QMenu, QWidget, QDialog)
-from PyQt6.QtGui import QIcon, QAction, QCursor, QPixmap, QPainter, QLinearGradient, QFont, QColor
+from PyQt6.QtGui import QIcon, QAction, QCursor
 from PyQt6.QtCore import QTimer, pyqtSignal, QObject, Qt
 
-# Enable High DPI scaling
-if hasattr(Qt.ApplicationAttribute, 'AA_EnableHighDpiScaling'):
-    QApplication.setAttribute(Qt.ApplicationAttribute.AA_EnableHighDpiScaling, True)
-if hasattr(Qt.ApplicationAttribute, 'AA_UseHighDpiPixmaps'):
-    QApplication.setAttribute(Qt.ApplicationAttribute.AA_UseHighDpiPixmaps, True)
-
-# Set environment variable for Windows DPI awareness
+# High DPI scaling is always on in Qt 6; this only matters for Windows DPI awareness
 os.environ["QT_AUTO_SCREEN_SCALE_FACTOR"] = "1"
 
-# Fix imports for PyInstaller
-if getattr(sys, 'frozen', False):
-    # If running as compiled exe
-    base_path = sys._MEIPASS
-    # Add src directory to path so imports work
-    sys.path.insert(0, os.path.join(base_path, 'src'))
-else:
-    # If running as script
+# Fix imports when running as a script
+# (a PyInstaller build bundles the modules itself, no path setup needed)
+if not getattr(sys, 'frozen', False):
     base_path = os.path.dirname(os.path.abspath(__file__))
     sys.path.insert(0, base_path)
 
-from pipeline import ProcessingPipeline
-from ui.overlay import OverlayController
-from ui.prompt_dialog import PromptDialog
-from ui.snipping import SnippingWidget
+logger = logging.getLogger(__name__)
+
+# Capture modes started from the tray menu and the floating button
+CAPTURE_REGION = 'region'
+CAPTURE_PROMPT = 'prompt'
+CAPTURE_SCROLLING = 'scrolling'
+
+# Bump when the tray icon drawing changes so the cached PNG is re-rendered
+TRAY_ICON_VERSION = 1
+
+# pipeline and ui modules are imported where they are first needed so that
+# argument parsing (and --help) does not pay for numpy/mss/widget imports
 
 class ScreenTranslatorApp:
     """
@@ -48,6 +46,8 @@ class ScreenTranslatorApp:
             source_lang: Source language code
             target_lang: Target language code
         """
+        from ui.overlay import OverlayController
+        
         self.source_lang = source_lang
         self.target_lang = target_lang
         self.is_scrolling_capture = False
@@ -57,25 +57,30 @@ class ScreenTranslatorApp:
         self.app = QApplication(sys.argv)
         self.app.setQuitOnLastWindowClosed(False)
         
+        # Primary screen and its device pixel ratio (used to convert logical
+        # selection coordinates to the physical pixels mss captures), kept
+        # up to date from Qt's screen signals instead of queried per capture
+        self._primary_screen = None
+        self._dpr = 1.0
+        self._on_primary_screen_changed(self.app.primaryScreen())
+        self.app.primaryScreenChanged.connect(self._on_primary_screen_changed)
+        
         # Create communication queues
         self.command_queue = Queue()
         self.result_queue = Queue()
         
-        # Start processing pipeline in separate process
-        self.pipeline = ProcessingPipeline(
-            self.command_queue,
-            self.result_queue,
-            source_lang=source_lang,
-            target_lang=target_lang
-        )
-        self.pipeline.start()
+        # Processing pipeline process, started once the tray icon is up
+        self.pipeline = None
         
         # Create overlay controller
         self.overlay_controller = OverlayController(self.result_queue)
         
-        # Snipping widget
+        # Snipping widget, created on first capture and reused afterwards
         self.snipping_widget = None
         
+        # Prompt dialog for "Capture & Ask", created on first use and reused
+        self._prompt_dialog = None
+        
         # Create system tray icon
         self.create_tray_icon()
         
@@ -84,39 +89,30 @@ class ScreenTranslatorApp:
         self.capture_button = FloatingCaptureButton(self.start_capture, self.start_prompt_capture)
         self.capture_button.show()
         
+        # Start the pipeline from the event loop so the tray icon and capture
+        # button paint first; commands queued before then are kept in the queue
+        QTimer.singleShot(0, self._start_pipeline)
+        
         print("Screen Translator started")
         print("Click the floating button or use tray menu to capture")
         print("Right-click the tray icon for options")
     
+    def _start_pipeline(self):
+        """Start the processing pipeline in a separate process"""
+        from pipeline import ProcessingPipeline
+        
+        self.pipeline = ProcessingPipeline(
+            self.command_queue,
+            self.result_queue,
+            source_lang=self.source_lang,
+            target_lang=self.target_lang
+        )
+        self.pipeline.start()
+    
     def create_tray_icon(self):
         """Create system tray icon with menu"""
         self.tray_icon = QSystemTrayIcon(self.app)
-        
-        # Create custom icon
-        pixmap = QPixmap(64, 64)
-        pixmap.fill(Qt.GlobalColor.transparent)
-        
-        painter = QPainter(pixmap)
-        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
-        
-        # Draw background
-        gradient = QLinearGradient(0, 0, 64, 64)
-        gradient.setColorAt(0, QColor("#3D5AFE"))
-        gradient.setColorAt(1, QColor("#651FFF"))
-        
-        painter.setBrush(gradient)
-        painter.setPen(Qt.PenStyle.NoPen)
-        painter.drawRoundedRect(4, 4, 56, 56, 12, 12)
-        
-        # Draw "文" (Language symbol)
-        painter.setPen(QColor("white"))
-        font = QFont("Arial", 32, QFont.Weight.Bold)
-        painter.setFont(font)
-        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, "文")
-        
-        painter.end()
-        
-        self.tray_icon.setIcon(QIcon(pixmap))
+        self.tray_icon.setIcon(self._load_tray_icon())
         
         # Create menu
         menu = QMenu()
@@ -170,6 +166,68 @@ class ScreenTranslatorApp:
         # Double-click to capture
         self.tray_icon.activated.connect(self.on_tray_activated)
     
+    def _load_tray_icon(self) -> QIcon:
+        """
+        Load the tray icon from the on-disk cache, rendering and caching it on first run.
+        
+        Returns:
+            Tray icon
+        """
+        from PyQt6.QtGui import QPixmap, QPainter, QLinearGradient, QFont, QColor
+        from config import CACHE_DIR
+        
+        cache_path = os.path.join(CACHE_DIR, f'tray_v{TRAY_ICON_VERSION}.png')
+        if os.path.exists(cache_path):
+            return QIcon(cache_path)
+        
+        # Create custom icon
+        pixmap = QPixmap(64, 64)
+        pixmap.fill(Qt.GlobalColor.transparent)
+        
+        painter = QPainter(pixmap)
+        painter.setRenderHint(QPainter.RenderHint.Antialiasing)
+        
+        # Draw background
+        gradient = QLinearGradient(0, 0, 64, 64)
+        gradient.setColorAt(0, QColor("#3D5AFE"))
+        gradient.setColorAt(1, QColor("#651FFF"))
+        
+        painter.setBrush(gradient)
+        painter.setPen(Qt.PenStyle.NoPen)
+        painter.drawRoundedRect(4, 4, 56, 56, 12, 12)
+        
+        # Draw "文" (Language symbol)
+        painter.setPen(QColor("white"))
+        font = QFont("Arial", 32, QFont.Weight.Bold)
+        painter.setFont(font)
+        painter.drawText(pixmap.rect(), Qt.AlignmentFlag.AlignCenter, "文")
+        
+        painter.end()
+        
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            pixmap.save(cache_path, 'PNG')
+        except Exception as e:
+            print(f"Could not cache tray icon: {e}")
+        
+        return QIcon(pixmap)
+    
+    def _on_primary_screen_changed(self, screen):
+        """Cache the new primary screen and follow its scaling changes"""
+        if self._primary_screen is not None:
+            try:
+                self._primary_screen.logicalDotsPerInchChanged.disconnect(self._refresh_dpr)
+            except (TypeError, RuntimeError):
+                pass
+        
+        self._primary_screen = screen
+        screen.logicalDotsPerInchChanged.connect(self._refresh_dpr)
+        self._refresh_dpr()
+    
+    def _refresh_dpr(self, *args):
+        """Re-read the device pixel ratio of the primary screen (e.g. after a scaling change)"""
+        self._dpr = self._primary_screen.devicePixelRatio()
+    
     def on_tray_activated(self, reason):
         """Handle tray icon activation"""
         if reason == QSystemTrayIcon.ActivationReason.DoubleClick:
@@ -177,49 +235,40 @@ class ScreenTranslatorApp:
     
     def start_capture(self):
         """Start the region selection process"""
-        print("Starting region capture...")
-        self.is_scrolling_capture = False
-        self.is_prompt_capture = False
-        
-        # Hide overlay temporarily
-        self.overlay_controller.hide()
-        
-        # Create and show snipping widget
-        self.snipping_widget = SnippingWidget()
-        self.snipping_widget.region_selected.connect(self.on_region_selected)
-        self.snipping_widget.show()
+        self._begin_capture(CAPTURE_REGION)
     
     def start_prompt_capture(self):
         """Start capture with prompt dialog"""
-        print("Starting capture & ask...")
-        self.is_scrolling_capture = False
-        self.is_prompt_capture = True
-        
-        # Hide overlay temporarily
-        self.overlay_controller.hide()
-        
-        # Create and show snipping widget
-        self.snipping_widget = SnippingWidget()
-        self.snipping_widget.region_selected.connect(self.on_region_selected)
-        self.snipping_widget.show()
-
+        self._begin_capture(CAPTURE_PROMPT)
+    
     def start_scrolling_capture(self):
         """Start the scrolling region selection process"""
-        print("Starting scrolling capture...")
-        self.is_scrolling_capture = True
-        self.is_prompt_capture = False
+        self._begin_capture(CAPTURE_SCROLLING)
+    
+    def _begin_capture(self, mode: str):
+        """
+        Start a region selection for the given capture mode.
+        
+        Args:
+            mode: CAPTURE_REGION, CAPTURE_PROMPT or CAPTURE_SCROLLING
+        """
+        logger.debug("Starting %s capture", mode)
+        self.is_prompt_capture = mode == CAPTURE_PROMPT
+        self.is_scrolling_capture = mode == CAPTURE_SCROLLING
         
         # Hide overlay temporarily
         self.overlay_controller.hide()
         
-        # Create and show snipping widget
-        self.snipping_widget = SnippingWidget()
-        self.snipping_widget.region_selected.connect(self.on_region_selected)
-        self.snipping_widget.show()
+        # Show the region selector, creating it on first use
+        if self.snipping_widget is None:
+            from ui.snipping import SnippingWidget
+            self.snipping_widget = SnippingWidget()
+            self.snipping_widget.region_selected.connect(self.on_region_selected)
+        self.snipping_widget.start()
     
     def capture_full_screen(self):
         """Capture the entire screen and process it"""
-        print("Capturing full screen...")
+        logger.debug("Capturing full screen")
         self.is_scrolling_capture = False
         self.is_prompt_capture = False
         
@@ -227,17 +276,16 @@ class ScreenTranslatorApp:
         self.overlay_controller.hide()
         
         # Get screen geometry
-        screen = QApplication.primaryScreen()
+        screen = self._primary_screen
         geometry = screen.geometry()
-        device_pixel_ratio = screen.devicePixelRatio()
         
-        # Calculate physical coordinates
+        # Logical coordinates (converted to physical in on_region_selected)
         x = 0
         y = 0
         width = geometry.width()
         height = geometry.height()
         
-        print(f"Full screen size (logical): {width}x{height}")
+        logger.debug("Full screen size (logical): %sx%s", width, height)
         
         # Process the full screen region
         self.on_region_selected(x, y, width, height)
@@ -255,15 +303,13 @@ class ScreenTranslatorApp:
         print("Settings saved, reloading configuration...")
         
         # Reload config to get new languages
-        import json
+        from config import load_config
         try:
-            config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.source_lang = config.get('source_lang', self.source_lang)
-                    self.target_lang = config.get('target_lang', self.target_lang)
-                    print(f"Updated languages: {self.source_lang} -> {self.target_lang}")
+            config = load_config()
+            if config:
+                self.source_lang = config.get('source_lang', self.source_lang)
+                self.target_lang = config.get('target_lang', self.target_lang)
+                print(f"Updated languages: {self.source_lang} -> {self.target_lang}")
         except Exception as e:
             print(f"Error reloading config in main app: {e}")
             
@@ -285,39 +331,46 @@ class ScreenTranslatorApp:
             x, y: Top-left corner coordinates (logical pixels)
             width, height: Region dimensions (logical pixels)
         """
-        print(f"DEBUG: Region selected (logical): ({x}, {y}, {width}, {height})")
+        logger.debug("Region selected (logical): (%s, %s, %s, %s)", x, y, width, height)
         
         if width <= 0 or height <= 0:
-            print("DEBUG: Invalid region dimensions!")
+            logger.warning("Invalid region dimensions: %sx%s", width, height)
             return
 
         # Handle Prompt Capture
         prompt = None
         if self.is_prompt_capture:
-            dialog = PromptDialog()
+            if self._prompt_dialog is None:
+                from ui.prompt_dialog import PromptDialog
+                self._prompt_dialog = PromptDialog()
+            
+            dialog = self._prompt_dialog
+            dialog.reset()
             if dialog.exec() == QDialog.DialogCode.Accepted:
                 prompt = dialog.get_prompt()
-                print(f"User prompt: {prompt}")
+                logger.debug("User prompt: %s", prompt)
             else:
                 print("Capture cancelled by user")
                 return
 
         # Show overlay with loading state
         self.overlay_controller.show_loading(x, y, width, height)
-        print("DEBUG: Overlay shown (loading)")
+        logger.debug("Overlay shown (loading)")
         
-        # Calculate DPI scale factor
-        screen = QApplication.primaryScreen()
-        device_pixel_ratio = screen.devicePixelRatio()
-        print(f"DEBUG: Device Pixel Ratio: {device_pixel_ratio}")
+        device_pixel_ratio = self._dpr
+        logger.debug("Device Pixel Ratio: %s", device_pixel_ratio)
         
-        # Adjust coordinates for High DPI displays
-        x_phys = int(x * device_pixel_ratio)
-        y_phys = int(y * device_pixel_ratio)
-        w_phys = int(width * device_pixel_ratio)
-        h_phys = int(height * device_pixel_ratio)
+        if device_pixel_ratio == 1.0:
+            # No display scaling: logical and physical pixels are the same
+            x_phys, y_phys, w_phys, h_phys = x, y, width, height
+        else:
+            # Adjust coordinates for High DPI displays (rounded to the nearest
+            # pixel; truncating loses an edge row/column at ratios like 1.25)
+            x_phys, y_phys, w_phys, h_phys = (
+                round(v * device_pixel_ratio) for v in (x, y, width, height)
+            )
         
-        print(f"DEBUG: Region (physical): ({x_phys}, {y_phys}, {w_phys}, {h_phys})")
+        logger.debug("Region (physical): (%d, %d, %d, %d)", x_phys, y_phys, w_phys, h_phys)
         
         # Send command to processing pipeline
         command_type = 'process_scrolling_region' if self.is_scrolling_capture else 'process_region'
@@ -333,7 +386,7 @@ class ScreenTranslatorApp:
         }
         self.command_queue.put(command)
         
-        print(f"DEBUG: Processing request sent to pipeline: {command}")
+        logger.debug("Processing request sent to pipeline: %s", command)
     
 
     
@@ -354,7 +407,8 @@ class ScreenTranslatorApp:
         self.command_queue.put({'type': 'shutdown'})
         
         # Wait for pipeline to finish
-        self.pipeline.join(timeout=2)
+        if self.pipeline:
+            self.pipeline.join(timeout=2)
         
         # Quit Qt application
         self.app.quit()
@@ -370,6 +424,11 @@ def main():
     # Required for multiprocessing on Windows
     mp.freeze_support()
     
+    # Debug logging is off unless SCREENTRANS_DEBUG is set (inherited by the
+    # pipeline process, which configures its own logging)
+    if os.environ.get('SCREENTRANS_DEBUG'):
+        logging.basicConfig(level=logging.DEBUG, format='%(name)s: %(message)s')
+    
     # Parse command line arguments for language selection
     import argparse
     parser = argparse.ArgumentParser(description='Screen Translator')
@@ -3,12 +3,52 @@ OCR Engine module using Tesseract for offline text recognition
 """
 
 import numpy as np
+from collections import OrderedDict
 from typing import List, Tuple, Optional
+import hashlib
+import queue
+import threading
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
 import pytesseract
 import cv2
 import os
 import sys
 
+# xxhash is optional; it hashes frames several times faster than blake2b
+try:
+    import xxhash
+except ImportError:
+    xxhash = None
+
+# Tesseract's own OpenMP threading scales poorly and fights with the parallel
+# tiles below; run each Tesseract single-threaded and parallelize across tiles.
+# Must be set before the Tesseract library is loaded (tesserocr import) and is
+# inherited by tesseract subprocesses.
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+
+# tesserocr is optional; it runs Tesseract in-process, avoiding a tesseract
+# subprocess, temp image file and language data reload on every call
+try:
+    import tesserocr
+except ImportError:
+    tesserocr = None
+
+# Number of recent OCR results kept, keyed by the exact image content
+OCR_CACHE_SIZE = 32
+
+# Tesseract instances (tesserocr APIs or processes) run at once by
+# detect_and_recognize_tiled
+OCR_WORKERS = max(1, min(4, (os.cpu_count() or 2) // 2))
+# Rows shared by neighbouring tiles; must exceed the tallest text line
+TILE_OVERLAP = 64
+# Smallest tile height used when splitting an image automatically; shorter
+# images are OCR'd in one pass
+MIN_TILE_HEIGHT = 360
+# Grayscale standard deviation below which an image is taken to be blank
+# (a single color, e.g. an empty subtitle area) and not OCR'd
+BLANK_STD_THRESHOLD = 2.0
+
 # Determine path to Tesseract
 if getattr(sys, 'frozen', False):
     # If running as compiled exe, look in the same directory as the exe
@@ -32,15 +72,30 @@ else:
 
 if os.path.exists(TESSERACT_CMD):
     pytesseract.pytesseract.tesseract_cmd = TESSERACT_CMD
-else:
+elif tesserocr is None:
     print("Warning: Tesseract executable not found. Please install Tesseract-OCR.")
 
+# Language data next to the Tesseract install, used by tesserocr
+TESSDATA_DIR = os.path.join(os.path.dirname(TESSERACT_CMD), 'tessdata')
+
 class OCREngine:
     """
     Wrapper for Tesseract OCR engine.
     Provides text detection and recognition from images.
     """
     
+    # Language codes in Tesseract format (e.g., 'en' -> 'eng', 'vi' -> 'vie')
+    LANG_MAP = {
+        'en': 'eng',
+        'vi': 'vie',
+        'es': 'spa',
+        'fr': 'fra',
+        'de': 'deu',
+        'ja': 'jpn',
+        'ko': 'kor',
+        'zh': 'chi_sim'
+    }
+    
     def __init__(self, languages=['en']):
         """
         Initialize the Tesseract engine.
@@ -51,36 +106,50 @@ class OCREngine:
         try:
             print(f"Initializing Tesseract OCR for languages: {languages}")
             
-            # Convert language codes to Tesseract format (e.g., 'en' -> 'eng', 'vi' -> 'vie')
-            self.lang_map = {
-                'en': 'eng',
-                'vi': 'vie',
-                'es': 'spa',
-                'fr': 'fra',
-                'de': 'deu',
-                'ja': 'jpn',
-                'ko': 'kor',
-                'zh': 'chi_sim'
-            }
-            
-            self.langs = "+".join([self.lang_map.get(l, l) for l in languages])
-            
-            # Verify tesseract is available
-            version = pytesseract.get_tesseract_version()
-            print(f"Tesseract OCR initialized successfully (Version: {version})")
-            print(f"Using executable at: {pytesseract.pytesseract.tesseract_cmd}")
+            self.langs = "+".join([self.LANG_MAP.get(l, l) for l in languages])
+            
+            # Image content key -> OCR results, least recently used first
+            self._ocr_cache = OrderedDict()
+            
+            # Worker threads for tiled OCR, created on first use
+            self._executor = None
+            
+            # In-process Tesseract APIs when tesserocr is installed: one per
+            # concurrent OCR worker (an API holds one image at a time), created
+            # on demand up to OCR_WORKERS
+            self._apis = []
+            self._free_apis = queue.SimpleQueue()
+            self._api_lock = threading.Lock()
+            if tesserocr is not None:
+                try:
+                    api = self._new_api()
+                    self._apis.append(api)
+                    self._free_apis.put(api)
+                    print("Tesseract OCR initialized in-process via tesserocr")
+                except Exception as e:
+                    print(f"tesserocr unavailable, using tesseract executable: {e}")
+            
+            if not self._apis:
+                # Verify tesseract is available
+                version = pytesseract.get_tesseract_version()
+                print(f"Tesseract OCR initialized successfully (Version: {version})")
+                print(f"Using executable at: {pytesseract.pytesseract.tesseract_cmd}")
             
         except Exception as e:
             print(f"Error initializing OCR engine: {e}")
             print("Please ensure Tesseract is installed correctly.")
             raise
     
-    def detect_and_recognize(self, image: np.ndarray) -> List[Tuple[List[List[int]], str, float]]:
+    def detect_and_recognize(self, image: np.ndarray,
+                             max_side: Optional[int] = None) -> List[Tuple[List[List[int]], str, float]]:
         """
         Detect and recognize text in an image.
         
         Args:
-            image: numpy array in BGR format (OpenCV format)
+            image: numpy array in BGR format (OpenCV format) or grayscale
+            max_side: If set, images whose longer side exceeds it are downscaled
+                before OCR (boxes are mapped back to the original size). Off by
+                default: small UI text needs its full resolution for Tesseract.
             
         Returns:
             List of tuples, each containing:
@@ -88,42 +157,45 @@ class OCREngine:
                 - text: Recognized text string
                 - confidence: Recognition confidence score (0-1)
             Returns empty list if no text detected or on error.
+        
+        Raises:
+            ValueError: If the image is not 8-bit
         """
+        # Outside the try below, so a wrong image type is not just printed
+        if image.dtype != np.uint8:
+            raise ValueError(f"expected uint8 image, got {image.dtype}")
+        
         try:
-            # Tesseract expects RGB format
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            else:
-                image_rgb = image
-            
-            # Get data including bounding boxes and confidence
-            # Output is a dict with keys: 'left', 'top', 'width', 'height', 'conf', 'text'
-            data = pytesseract.image_to_data(image_rgb, lang=self.langs, output_type=pytesseract.Output.DICT)
-            
-            formatted_results = []
-            n_boxes = len(data['text'])
-            
-            for i in range(n_boxes):
-                # Filter out empty text and low confidence results
-                # conf is -1 for empty blocks/structure
-                conf = float(data['conf'][i])
-                text = data['text'][i].strip()
-                
-                if conf > 0 and text:
-                    x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                    
-                    # Create bbox points [[x1,y1], [x2,y2], [x3,y3], [x4,y4]]
-                    bbox = [
-                        [x, y],          # Top-left
-                        [x + w, y],      # Top-right
-                        [x + w, y + h],  # Bottom-right
-                        [x, y + h]       # Bottom-left
-                    ]
-                    
-                    # Normalize confidence to 0-1 range
-                    normalized_conf = conf / 100.0
-                    
-                    formatted_results.append((bbox, text, normalized_conf))
+            # Make a strided view (e.g. a crop) contiguous once here rather than
+            # in both the hashing and the grayscale conversion below
+            if not image.flags['C_CONTIGUOUS']:
+                image = np.ascontiguousarray(image)
+            
+            cache_key = (self._image_key(image), max_side)
+            cached = self._ocr_cache.get(cache_key)
+            if cached is not None:
+                self._ocr_cache.move_to_end(cache_key)
+                return cached
+            
+            # Tesseract binarizes a grayscale version of the image anyway, and a
+            # single channel is a third of the pixel data to hand to tesseract
+            image_gray = self._to_gray(image)
+            if self.is_blank(image_gray):
+                return []
+            
+            scale = 1.0
+            longest = max(image_gray.shape[:2])
+            if max_side and longest > max_side:
+                scale = max_side / longest
+                image_gray = cv2.resize(image_gray, None, fx=scale, fy=scale,
+                                        interpolation=cv2.INTER_AREA)
+            image_gray = self._binarize(image_gray)
+            
+            formatted_results = self._recognize(image_gray, scale)
+            
+            self._ocr_cache[cache_key] = formatted_results
+            if len(self._ocr_cache) > OCR_CACHE_SIZE:
+                self._ocr_cache.popitem(last=False)
             
             return formatted_results
             
@@ -131,37 +203,294 @@ class OCREngine:
             print(f"Error during OCR: {e}")
             return []
     
+    def detect_and_recognize_tiled(self, image: np.ndarray,
+                                   tile_height: Optional[int] = None) -> List[Tuple[List[List[int]], str, float]]:
+        """
+        Detect and recognize text in a tall image (e.g. a stitched scrolling
+        capture or a full screen) by OCR'ing horizontal tiles in parallel.
+        
+        Each tile is padded with TILE_OVERLAP rows above and below, and only
+        the words whose top edge falls inside the tile's own rows are kept,
+        so lines crossing a tile boundary are recognized exactly once.
+        
+        Args:
+            image: numpy array in BGR format (OpenCV format) or grayscale
+            tile_height: Rows per tile (e.g. the height of one scrolled page).
+                By default the image is split into OCR_WORKERS tiles of at
+                least MIN_TILE_HEIGHT rows.
+            
+        Returns:
+            Same format as detect_and_recognize, with boxes in image coordinates
+        
+        Raises:
+            ValueError: If the image is not 8-bit
+        """
+        if image.dtype != np.uint8:
+            raise ValueError(f"expected uint8 image, got {image.dtype}")
+        
+        height = image.shape[0]
+        if tile_height is None:
+            tile_height = max(MIN_TILE_HEIGHT, -(-height // OCR_WORKERS))
+        if tile_height <= 0 or height <= tile_height + TILE_OVERLAP:
+            return self.detect_and_recognize(image)
+        
+        try:
+            if not image.flags['C_CONTIGUOUS']:
+                image = np.ascontiguousarray(image)
+            
+            cache_key = (self._image_key(image), ('tiled', tile_height))
+            cached = self._ocr_cache.get(cache_key)
+            if cached is not None:
+                self._ocr_cache.move_to_end(cache_key)
+                return cached
+            
+            image_gray = self._to_gray(image)
+            if self.is_blank(image_gray):
+                return []
+            
+            # Binarize the whole image so every tile gets the same threshold
+            image_gray = self._binarize(image_gray)
+            
+            def recognize_tile(start):
+                top = max(0, start - TILE_OVERLAP)
+                bottom = min(height, start + tile_height + TILE_OVERLAP)
+                results = self._recognize(image_gray[top:bottom], y_offset=top)
+                return [r for r in results if start <= r[0][0][1] < start + tile_height]
+            
+            # Each tile runs in its own tesseract process (pytesseract) or on
+            # its own tesserocr API, which releases the GIL while recognizing,
+            # so threads are enough to keep several cores busy
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=OCR_WORKERS)
+            tiles = self._executor.map(recognize_tile, range(0, height, tile_height))
+            formatted_results = [r for tile_results in tiles for r in tile_results]
+            
+            self._ocr_cache[cache_key] = formatted_results
+            if len(self._ocr_cache) > OCR_CACHE_SIZE:
+                self._ocr_cache.popitem(last=False)
+            
+            return formatted_results
+            
+        except Exception as e:
+            print(f"Error during tiled OCR: {e}")
+            return []
+    
+    def _recognize(self, image_gray: np.ndarray, scale: float = 1.0,
+                   y_offset: int = 0) -> List[Tuple[List[List[int]], str, float]]:
+        """
+        Run Tesseract on a grayscale image and collect word boxes.
+        
+        Args:
+            image_gray: Grayscale image to OCR
+            scale: Factor the image was resized by; boxes are divided by it
+            y_offset: Added to every box's y coordinates (position of a tile)
+            
+        Returns:
+            Same format as detect_and_recognize
+        """
+        if self._apis:
+            boxes, texts, confs = self._words_tesserocr(image_gray)
+        else:
+            boxes, texts, confs = self._words_pytesseract(image_gray)
+        
+        if not texts:
+            return []
+        
+        # Build the corners of all boxes at once: (N, 4) x, y, w, h -> (N, 4, 2)
+        if scale != 1.0:
+            boxes = np.rint(boxes / scale).astype(np.int32)
+        x, y, w, h = boxes.T
+        y = y + y_offset
+        corners = np.stack((
+            x, y,           # Top-left
+            x + w, y,       # Top-right
+            x + w, y + h,   # Bottom-right
+            x, y + h        # Bottom-left
+        ), axis=1).reshape(-1, 4, 2)
+        
+        # Normalize confidence to 0-1 range
+        return list(zip(corners.tolist(), texts, (confs / 100.0).tolist()))
+    
+    def _words_pytesseract(self, image_gray: np.ndarray) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Word boxes from a tesseract subprocess: ((N, 4) x, y, w, h; texts; conf 0-100)"""
+        # Get data including bounding boxes and confidence
+        # Output is a dict with keys: 'left', 'top', 'width', 'height', 'conf', 'text'
+        data = pytesseract.image_to_data(image_gray, lang=self.langs, output_type=pytesseract.Output.DICT)
+        
+        # Filter out empty text and low confidence results
+        # conf is -1 for empty blocks/structure
+        texts = [text.strip() for text in data['text']]
+        confs = np.asarray(data['conf'], dtype=np.float64)
+        keep = np.flatnonzero((confs > 0) & np.array([bool(text) for text in texts], dtype=bool))
+        
+        boxes = np.column_stack((data['left'], data['top'], data['width'], data['height']))
+        return (boxes[keep].astype(np.int32), [texts[i] for i in keep], confs[keep])
+    
+    def _words_tesserocr(self, image_gray: np.ndarray) -> Tuple[np.ndarray, List[str], np.ndarray]:
+        """Word boxes from the in-process tesserocr API: ((N, 4) x, y, w, h; texts; conf 0-100)"""
+        from PIL import Image
+        
+        boxes, texts, confs = [], [], []
+        with self._borrow_api() as api:
+            api.SetImage(Image.fromarray(image_gray))
+            api.Recognize()
+            iterator = api.GetIterator()
+            
+            if iterator is not None:
+                for word in tesserocr.iterate_level(iterator, tesserocr.RIL.WORD):
+                    conf = word.Confidence(tesserocr.RIL.WORD)
+                    text = (word.GetUTF8Text(tesserocr.RIL.WORD) or '').strip()
+                    box = word.BoundingBox(tesserocr.RIL.WORD)
+                    
+                    if conf > 0 and text and box:
+                        boxes.append(box)
+                        texts.append(text)
+                        confs.append(conf)
+        
+        # (x1, y1, x2, y2) -> (x, y, w, h)
+        boxes = np.array(boxes, dtype=np.int32).reshape(-1, 4)
+        boxes[:, 2:] -= boxes[:, :2]
+        return boxes, texts, np.array(confs, dtype=np.float64)
+    
     def get_text_only(self, image: np.ndarray) -> str:
         """
         Extract only the text from an image.
         """
         try:
-            if len(image.shape) == 3 and image.shape[2] == 3:
-                image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            else:
-                image_rgb = image
+            if self._apis:
+                from PIL import Image
                 
-            return pytesseract.image_to_string(image_rgb, lang=self.langs).strip()
+                with self._borrow_api() as api:
+                    api.SetImage(Image.fromarray(self._binarize(self._to_gray(image))))
+                    return api.GetUTF8Text().strip()
+            
+            return pytesseract.image_to_string(self._binarize(self._to_gray(image)), lang=self.langs).strip()
         except Exception as e:
             print(f"Error getting text: {e}")
             return ""
     
+    @staticmethod
+    def _image_key(image: np.ndarray) -> tuple:
+        """Exact-content key for an image: 64-bit hash of its pixels plus its shape"""
+        pixels = np.ascontiguousarray(image)  # no copy if already contiguous
+        if xxhash is not None:
+            digest = xxhash.xxh3_64_intdigest(pixels)
+        else:
+            digest = hashlib.blake2b(pixels, digest_size=8).digest()
+        return (digest, image.shape, image.dtype.str)
+    
+    @staticmethod
+    def _to_gray(image: np.ndarray) -> np.ndarray:
+        """Convert a BGR/BGRA image to grayscale (grayscale input is returned as-is)"""
+        if image.ndim == 3:
+            code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+            return cv2.cvtColor(image, code)
+        return image
+    
+    @staticmethod
+    def is_blank(image_gray: np.ndarray) -> bool:
+        """
+        Check if a grayscale image is (nearly) a single color, so has no text.
+        
+        One pass over the pixels, against hundreds of milliseconds for a
+        Tesseract run that finds nothing. The full-resolution deviation is
+        used because downscaling would average away a lone word in a large
+        region.
+        """
+        _, std = cv2.meanStdDev(image_gray)
+        return float(std[0, 0]) < BLANK_STD_THRESHOLD
+    
+    @staticmethod
+    def _binarize(image_gray: np.ndarray) -> np.ndarray:
+        """
+        Threshold a grayscale image (Otsu) into dark text on a light background.
+        
+        Doing this once up front spares Tesseract its own thresholding, and
+        most lines are read on the first try whatever the theme. Text of the
+        other polarity (a light-on-dark header or button in a light window)
+        stays inverted; Tesseract's retry of low-confidence lines inverted
+        (tessedit_do_invert, left on) recovers it.
+        """
+        if image_gray.mean() < 127:
+            image_gray = cv2.bitwise_not(image_gray)
+        _, binary = cv2.threshold(image_gray, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+        return binary
+    
+    def close(self):
+        """Release the tiled OCR worker threads and the tesserocr APIs"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        with self._api_lock:
+            for api in self._apis:
+                api.End()
+            self._apis = []
+    
+    def _new_api(self):
+        """Create a tesserocr API for the configured languages"""
+        kwargs = {'lang': self.langs}
+        if os.path.isdir(TESSDATA_DIR):
+            kwargs['path'] = TESSDATA_DIR
+        return tesserocr.PyTessBaseAPI(**kwargs)
+    
+    @contextmanager
+    def _borrow_api(self):
+        """Lend a tesserocr API to the calling thread, creating up to OCR_WORKERS of them"""
+        try:
+            api = self._free_apis.get_nowait()
+        except queue.Empty:
+            api = None
+            with self._api_lock:
+                if len(self._apis) < OCR_WORKERS:
+                    api = self._new_api()
+                    self._apis.append(api)
+            if api is None:
+                api = self._free_apis.get()
+        try:
+            yield api
+        finally:
+            self._free_apis.put(api)
+    
     def get_bounding_boxes(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
         """
         Get bounding boxes for detected text regions.
+        
+        With tesserocr only Tesseract's layout analysis runs; recognition,
+        most of the OCR time, is skipped. The tesseract executable has no
+        detection-only mode, so without tesserocr the image is fully OCR'd.
         """
-        results = self.detect_and_recognize(image)
+        if not self._apis:
+            return self._boxes_from_results(self.detect_and_recognize(image))
+        
+        try:
+            from PIL import Image
+            
+            image_gray = self._to_gray(np.ascontiguousarray(image))
+            if self.is_blank(image_gray):
+                return []
+            
+            with self._borrow_api() as api:
+                api.SetImage(Image.fromarray(self._binarize(image_gray)))
+                # Never calls Recognize() or GetUTF8Text()
+                components = api.GetComponentImages(tesserocr.RIL.WORD, True)
+            
+            return [(c[1]['x'], c[1]['y'], c[1]['w'], c[1]['h']) for c in components]
+            
+        except Exception as e:
+            print(f"Error detecting text boxes: {e}")
+            return []
+    
+    @staticmethod
+    def _boxes_from_results(results: List[Tuple[List[List[int]], str, float]]) -> List[Tuple[int, int, int, int]]:
+        """Convert detect_and_recognize results to (x, y, w, h) boxes"""
         if not results:
             return []
             
-        bboxes = []
-        for bbox, _, _ in results:
-            # Extract x, y, w, h from the 4 points
-            x = bbox[0][0]
-            y = bbox[0][1]
-            w = bbox[1][0] - x
-            h = bbox[2][1] - y
-            bboxes.append((int(x), int(y), int(w), int(h)))
-            
-        return bboxes
+        # Stack the 4 corner points of every box into one (N, 4, 2) array and
+        # reduce them all at once
+        points = np.array([bbox for bbox, _, _ in results], dtype=np.int32)
+        mins = points.min(axis=1)
+        sizes = points.max(axis=1) - mins
+        
+        return [tuple(box) for box in np.hstack((mins, sizes)).tolist()]
 
@@ -0,0 +1,195 @@
+"""
+OCR Engine module using PaddleOCR (PP-OCR), which can run on the GPU
+"""
+
+import numpy as np
+from collections import OrderedDict
+from typing import List, Tuple, Optional
+import cv2
+
+from ocr_engine import OCREngine, OCR_CACHE_SIZE, TILE_OVERLAP
+
+# PaddleOCR's text detector shrinks the longer image side to this many pixels,
+# so taller images (scrolling captures) are OCR'd in tiles of this height
+PADDLE_TILE_HEIGHT = 960
+
+class PaddleOCREngine:
+    """
+    Wrapper for the PaddleOCR engine, with the same interface as OCREngine.
+    Detects text lines and recognizes them in batches, on the GPU if available.
+    """
+    
+    # Language codes whose PaddleOCR model name differs
+    LANG_MAP = {
+        'de': 'german',
+        'ja': 'japan',
+        'ko': 'korean',
+        'zh': 'ch'
+    }
+    
+    def __init__(self, languages=['en'], use_gpu: bool = True):
+        """
+        Initialize PaddleOCR.
+        
+        Args:
+            languages: List of language codes (default: ['en'] for English);
+                PaddleOCR recognizes one language, the first one is used
+            use_gpu: Run the models on the GPU (needs paddlepaddle-gpu)
+        """
+        try:
+            from paddleocr import PaddleOCR
+            
+            print(f"Initializing PaddleOCR for languages: {languages} (GPU: {use_gpu})")
+            
+            lang = self.LANG_MAP.get(languages[0], languages[0])
+            
+            # Recognize up to 16 detected text lines per batch
+            self.paddle = PaddleOCR(use_angle_cls=False, lang=lang, use_gpu=use_gpu,
+                                    rec_batch_num=16, show_log=False)
+            
+            # Image content key -> OCR results, least recently used first
+            self._ocr_cache = OrderedDict()
+            
+            print("PaddleOCR initialized successfully")
+        
+        except Exception as e:
+            print(f"Error initializing PaddleOCR: {e}")
+            raise
+    
+    def detect_and_recognize(self, image: np.ndarray,
+                             max_side: Optional[int] = None) -> List[Tuple[List[List[int]], str, float]]:
+        """
+        Detect and recognize text in an image.
+        
+        Args:
+            image: numpy array in BGR format (OpenCV format) or grayscale
+            max_side: Ignored (PaddleOCR resizes images for detection itself)
+        
+        Returns:
+            Same format as OCREngine.detect_and_recognize
+        """
+        try:
+            if not image.flags['C_CONTIGUOUS']:
+                image = np.ascontiguousarray(image)
+            
+            cache_key = OCREngine._image_key(image)
+            cached = self._ocr_cache.get(cache_key)
+            if cached is not None:
+                self._ocr_cache.move_to_end(cache_key)
+                return cached
+            
+            formatted_results = self._recognize(image)
+            
+            self._ocr_cache[cache_key] = formatted_results
+            if len(self._ocr_cache) > OCR_CACHE_SIZE:
+                self._ocr_cache.popitem(last=False)
+            
+            return formatted_results
+        
+        except Exception as e:
+            print(f"Error during OCR: {e}")
+            return []
+    
+    def detect_and_recognize_tiled(self, image: np.ndarray,
+                                   tile_height: Optional[int] = None) -> List[Tuple[List[List[int]], str, float]]:
+        """
+        Detect and recognize text in a tall image tile by tile, so the text
+        detector does not shrink it.
+        
+        Args:
+            image: numpy array in BGR format (OpenCV format) or grayscale
+            tile_height: Rows per tile (default: PADDLE_TILE_HEIGHT)
+        
+        Returns:
+            Same format as detect_and_recognize, with boxes in image coordinates
+        """
+        height = image.shape[0]
+        tile_height = tile_height or PADDLE_TILE_HEIGHT
+        if height <= tile_height + TILE_OVERLAP:
+            return self.detect_and_recognize(image)
+        
+        try:
+            # The GPU runs one image at a time, so tiles are OCR'd in turn.
+            # As in OCREngine, each tile keeps the lines starting in its own rows.
+            formatted_results = []
+            for start in range(0, height, tile_height):
+                top = max(0, start - TILE_OVERLAP)
+                bottom = min(height, start + tile_height + TILE_OVERLAP)
+                results = self._recognize(image[top:bottom], y_offset=top)
+                formatted_results.extend(r for r in results if start <= r[0][0][1] < start + tile_height)
+            return formatted_results
+        
+        except Exception as e:
+            print(f"Error during tiled OCR: {e}")
+            return []
+    
+    def _recognize(self, image: np.ndarray, y_offset: int = 0) -> List[Tuple[List[List[int]], str, float]]:
+        """
+        Run PaddleOCR on an image and collect line boxes.
+        
+        Args:
+            image: BGR or grayscale image
+            y_offset: Added to every box's y coordinates (position of a tile)
+        
+        Returns:
+            Same format as detect_and_recognize
+        """
+        if OCREngine.is_blank(OCREngine._to_gray(image)):
+            return []
+        
+        if image.ndim == 2:
+            image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+        elif image.shape[2] == 4:
+            image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+        
+        # One result list per input image; None when no text was found
+        lines = self.paddle.ocr(image, cls=False)[0] or []
+        
+        formatted_results = []
+        for points, (text, confidence) in lines:
+            text = text.strip()
+            if not text:
+                continue
+            # Paddle returns the 4 corners clockwise from the top-left as floats
+            bbox = [[int(round(x)), int(round(y)) + y_offset] for x, y in points]
+            formatted_results.append((bbox, text, float(confidence)))
+        
+        return formatted_results
+    
+    def get_text_only(self, image: np.ndarray) -> str:
+        """
+        Extract only the text from an image.
+        """
+        return " ".join([text for _, text, _ in self.detect_and_recognize(image)])
+    
+    def get_bounding_boxes(self, image: np.ndarray) -> List[Tuple[int, int, int, int]]:
+        """
+        Get bounding boxes for detected text regions.
+        Only PaddleOCR's text detector runs; recognition is skipped.
+        """
+        try:
+            if OCREngine.is_blank(OCREngine._to_gray(image)):
+                return []
+            
+            if image.ndim == 2:
+                image = cv2.cvtColor(image, cv2.COLOR_GRAY2BGR)
+            elif image.shape[2] == 4:
+                image = cv2.cvtColor(image, cv2.COLOR_BGRA2BGR)
+            
+            # With rec=False each result is just the 4 corners of a text line
+            lines = self.paddle.ocr(image, cls=False, rec=False)[0] or []
+            if not lines:
+                return []
+            
+            points = np.rint(np.array(lines, dtype=np.float32)).astype(np.int32)
+            mins = points.min(axis=1)
+            sizes = points.max(axis=1) - mins
+            return [tuple(box) for box in np.hstack((mins, sizes)).tolist()]
+            
+        except Exception as e:
+            print(f"Error detecting text boxes: {e}")
+            return []
+    
+    def close(self):
+        """Nothing to release; PaddleOCR frees its models with the process"""
+        pass
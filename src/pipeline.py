@@ -4,15 +4,28 @@ to avoid blocking the UI thread
 """
 
 import multiprocessing as mp
+import queue
 from multiprocessing import Process, Queue
 import numpy as np
-from typing import Dict, Any, Optional
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional
 import time
+import os
+import logging
 
 from capture import ScreenCapture
 # OCREngine and Translator will be imported lazily in initialize_engines()
 # to avoid loading heavy dependencies (PyTorch, etc.) at import time
 
+logger = logging.getLogger(__name__)
+
+# Number of recent capture results kept for repeated-capture detection
+RESULT_CACHE_SIZE = 32
+# Max queued region requests translated together in one batch
+TRANSLATE_BATCH_SIZE = 8
+# File the pipeline's debug log is written to (with SCREENTRANS_DEBUG set)
+DEBUG_LOG_PATH = 'ocr_log.txt'
+
 
 class ProcessingPipeline(Process):
     """
@@ -42,6 +55,12 @@ class ProcessingPipeline(Process):
         self.screen_capture = None
         self.ocr_engine = None
         self.translator = None
+        
+        # Exact image content key -> result of a recent capture, oldest first
+        self._result_cache = OrderedDict()
+        
+        # Background thread writing the debug log, when debugging
+        self._log_listener = None
     
     def initialize_engines(self):
         """
@@ -59,8 +78,18 @@ class ProcessingPipeline(Process):
             self.screen_capture = ScreenCapture()
             print("✓ Screen capture initialized")
             
-            # Initialize OCR engine
-            self.ocr_engine = OCREngine()
+            # Initialize OCR engine (PaddleOCR if configured and installed,
+            # Tesseract otherwise)
+            from config import load_config
+            config = load_config()
+            if config.get('ocr_engine') == 'paddle':
+                try:
+                    from paddle_ocr_engine import PaddleOCREngine
+                    self.ocr_engine = PaddleOCREngine(use_gpu=config.get('ocr_use_gpu', True))
+                except Exception as e:
+                    print(f"PaddleOCR unavailable, using Tesseract: {e}")
+            if self.ocr_engine is None:
+                self.ocr_engine = OCREngine()
             print("✓ OCR engine initialized")
             
             # Initialize translator
@@ -71,6 +100,9 @@ class ProcessingPipeline(Process):
             else:
                 print("⚠ Translator not available (model not found)")
             
+            # Pay Tesseract's cold start now rather than on the first capture
+            self.warmup()
+            
             # Send initialization complete signal
             self.result_queue.put({
                 'type': 'init_complete',
@@ -92,151 +124,390 @@ class ProcessingPipeline(Process):
         Args:
             region: Dictionary with 'x', 'y', 'width', 'height' keys
         """
+        self.process_regions([region])
+    
+    def process_regions(self, regions: List[Dict[str, int]]):
+        """
+        Capture, OCR, and translate several screen regions.
+        
+        Each region is captured and OCR'd in turn, then all their texts are
+        translated in a single batch. In Gemini vision mode every capture is
+        translated with its own image instead.
+        
+        Args:
+            regions: Dictionaries with 'x', 'y', 'width', 'height' keys
+        """
+        # Grayscale is enough for OCR unless the translator sends the image
+        # to Gemini vision
+        vision = self.translator.uses_vision()
+        batch = len(regions) > 1 and not vision
+        pending = []
+        
+        for region in regions:
+            try:
+                job = self._capture_and_recognize(region, grayscale=not vision)
+                if job is None:
+                    continue
+                if batch:
+                    pending.append(job)
+                else:
+                    self._translate_and_send(job)
+            except Exception as e:
+                print(f"Error processing region: {e}")
+                self.result_queue.put({
+                    'type': 'error',
+                    'error': str(e)
+                })
+        
+        if not pending:
+            return
+        
         try:
-            start_time = time.time()
+            texts = [" ".join([text for _, text, _ in job['ocr_results']]) for job in pending]
             
-            # Capture screen region
-            image = self.screen_capture.capture_region(
-                region['x'], region['y'], region['width'], region['height']
-            )
+            translate_start = time.time()
+            if self.translator.is_available():
+                translations = self.translator.translate_batch(texts)
+            else:
+                translations = texts
+            # Each region is charged an equal share of the batch
+            translate_time = (time.time() - translate_start) / len(pending)
+            logger.debug("Translated %d regions in one batch", len(pending))
             
-            if image is None:
+            for job, translated_full in zip(pending, translations):
+                self._send_result(job, translated_full, translate_time)
+                
+        except Exception as e:
+            print(f"Error translating regions: {e}")
+            for _ in pending:
                 self.result_queue.put({
                     'type': 'error',
-                    'error': 'Failed to capture screen region'
+                    'error': str(e)
                 })
-                return
-            
-            capture_time = time.time() - start_time
-            
-            # Perform OCR
-            ocr_start = time.time()
-            ocr_results = self.ocr_engine.detect_and_recognize(image)
-            ocr_time = time.time() - ocr_start
-            
-            # Log OCR results for debugging (both console and file)
-            log_lines = []
-            log_lines.append(f"\n{'='*60}")
-            log_lines.append(f"OCR DETECTED {len(ocr_results)} TEXT SEGMENTS:")
-            log_lines.append(f"{'='*60}")
-            
-            ocr_results = self.ocr_engine.detect_and_recognize(image)
-            ocr_time = time.time() - ocr_start
-            
-            # Log OCR results
-            log_lines = []
-            log_lines.append(f"\n{'='*60}")
-            log_lines.append(f"SCROLLING OCR DETECTED {len(ocr_results)} TEXT SEGMENTS:")
-            log_lines.append(f"{'='*60}")
+    
+    def _capture_and_recognize(self, region: Dict[str, int],
+                               grayscale: bool) -> Optional[Dict[str, Any]]:
+        """
+        Capture a screen region and OCR it.
+        
+        Args:
+            region: Dictionary with 'x', 'y', 'width', 'height' keys
+            grayscale: Capture a single-channel image
             
-            if ocr_results:
-                combined_text = " ".join([text for _, text, _ in ocr_results])
-                log_lines.append(f"\nCOMBINED TEXT:")
-                log_lines.append(f">>> {combined_text}")
-                log_lines.append(f"{'='*60}\n")
+        Returns:
+            OCR'd capture still to be translated (see _recognize), or None if
+            a result or error has already been sent for this region
+        """
+        start_time = time.time()
+        
+        # The image is OCR'd before the next capture, so the capture buffer is
+        # reused (vision mode translates each image before the next capture too)
+        image = self.screen_capture.capture_region(
+            region['x'], region['y'], region['width'], region['height'],
+            grayscale=grayscale,
+            reuse_buffer=True
+        )
+        
+        if image is None:
+            self.result_queue.put({
+                'type': 'error',
+                'error': 'Failed to capture screen region'
+            })
+            return None
+        
+        capture_time = time.time() - start_time
+        
+        # Same region re-captured with exactly the same content: skip OCR
+        # and translation and resend the earlier result. A perceptual hash
+        # would also match frames that differ by a word.
+        from ocr_engine import OCREngine
+        frame_key = OCREngine._image_key(image)
+        cached = self._lookup_result(frame_key)
+        if cached is not None:
+            logger.debug("Capture matches a recent frame, reusing its result")
+            self.result_queue.put({
+                **cached,
+                'region': region,
+                'timing': {
+                    'capture': capture_time,
+                    'ocr': 0,
+                    'translation': 0,
+                    'total': time.time() - start_time
+                }
+            })
+            return None
+        
+        return self._recognize(image, region, start_time, capture_time, frame_key)
+    
+    def process_scrolling_region(self, region: Dict[str, int]):
+        """
+        Capture a scrolling region page by page, then OCR and translate it.
+        
+        The pages are stitched into one image during capture, so the whole
+        scrolled content goes through a single OCR pass.
+        
+        Args:
+            region: Dictionary with 'x', 'y', 'width', 'height' keys
+        """
+        try:
+            start_time = time.time()
             
-            for line in log_lines:
-                print(line)
+            image = self.screen_capture.capture_scrolling_region(
+                region['x'], region['y'], region['width'], region['height']
+            )
             
-            if not ocr_results:
-                print("No text detected in scrolling region")
+            if image is None:
                 self.result_queue.put({
-                    'type': 'result',
-                    'region': region,
-                    'texts': [],
-                    'timing': {
-                        'capture': capture_time,
-                        'ocr': ocr_time,
-                        'translation': 0,
-                        'total': time.time() - start_time
-                    }
+                    'type': 'error',
+                    'error': 'Failed to capture scrolling region'
                 })
                 return
             
-            # Translate
-            translate_start = time.time()
-            translations = []
-            
-            if self.translator.is_available():
-                texts_to_translate = [text for _, text, _ in ocr_results]
-                combined_text = " ".join(texts_to_translate)
-                # Pass image for Vision mode
-                translated_full = self.translator.translate(combined_text, image=image)
-                
-                print(f"\nTRANSLATION:")
-                print(f"Original: {combined_text}")
-                print(f"Translated: {translated_full}\n")
-            else:
-                translated_full = " ".join([text for _, text, _ in ocr_results])
+            capture_time = time.time() - start_time
             
-            translate_time = time.time() - translate_start
+            # OCR the stitched pages as page-sized tiles in parallel
+            self._recognize_and_translate(image, region, start_time, capture_time,
+                                          tile_height=region['height'])
             
-            # Prepare results
-            for i, (bbox, original_text, confidence) in enumerate(ocr_results):
-                translations.append({
-                    'bbox': bbox,
-                    'original': original_text,
-                    'translated': original_text,
-                    'confidence': confidence
-                })
+        except Exception as e:
+            print(f"Error processing scrolling region: {e}")
+            self.result_queue.put({
+                'type': 'error',
+                'error': str(e)
+            })
+    
+    def _recognize_and_translate(self, image: np.ndarray, region: Dict[str, int],
+                                 start_time: float, capture_time: float,
+                                 frame_key: Optional[tuple] = None,
+                                 tile_height: Optional[int] = None):
+        """
+        OCR and translate a captured image and send the result to the UI.
+        
+        Args:
+            image: Captured image (BGR or grayscale)
+            region: Region the image was captured from
+            start_time: time.time() when the capture started
+            capture_time: Seconds spent capturing
+            frame_key: Key to cache the result under (see _lookup_result), or None
+            tile_height: Height of the tiles OCR'd in parallel (default: chosen
+                by the OCR engine; small images are OCR'd in one pass)
+        """
+        job = self._recognize(image, region, start_time, capture_time, frame_key, tile_height)
+        if job is not None:
+            self._translate_and_send(job)
+    
+    def _recognize(self, image: np.ndarray, region: Dict[str, int],
+                   start_time: float, capture_time: float,
+                   frame_key: Optional[tuple] = None,
+                   tile_height: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """
+        OCR a captured image. If no text is found, the (empty) result is sent
+        to the UI right away.
+        
+        Args:
+            Same as _recognize_and_translate
             
+        Returns:
+            Dictionary with the image, region, OCR results, timings and
+            frame_key, to be translated; None if no text was detected
+        """
+        # Perform OCR
+        ocr_start = time.time()
+        ocr_results = self.ocr_engine.detect_and_recognize_tiled(image, tile_height)
+        ocr_time = time.time() - ocr_start
+        
+        # Log OCR results (the combined text is only built when debugging)
+        logger.debug("OCR detected %d text segments", len(ocr_results))
+        if ocr_results and logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Combined text: %s", " ".join([text for _, text, _ in ocr_results]))
+        
+        if not ocr_results:
+            logger.debug("No text detected in region")
             result_data = {
                 'type': 'result',
                 'region': region,
-                'texts': translations,
-                'full_translation': translated_full,
+                'texts': [],
                 'timing': {
                     'capture': capture_time,
                     'ocr': ocr_time,
-                    'translation': translate_time,
+                    'translation': 0,
                     'total': time.time() - start_time
                 }
             }
-            
+            if frame_key is not None:
+                self._store_result(frame_key, result_data)
             self.result_queue.put(result_data)
+            return None
+        
+        return {
+            'image': image,
+            'region': region,
+            'ocr_results': ocr_results,
+            'start_time': start_time,
+            'capture_time': capture_time,
+            'ocr_time': ocr_time,
+            'frame_key': frame_key
+        }
+    
+    def _translate_and_send(self, job: Dict[str, Any]):
+        """Translate one OCR'd capture (see _recognize) and send the result to the UI"""
+        translate_start = time.time()
+        combined_text = " ".join([text for _, text, _ in job['ocr_results']])
+        
+        if self.translator.is_available():
+            # Pass image for Vision mode
+            translated_full = self.translator.translate(combined_text, image=job['image'])
             
-        except Exception as e:
-            print(f"Error processing scrolling region: {e}")
-            self.result_queue.put({
-                'type': 'error',
-                'error': str(e)
+            logger.debug("Original: %s", combined_text)
+            logger.debug("Translated: %s", translated_full)
+        else:
+            translated_full = combined_text
+        
+        self._send_result(job, translated_full, time.time() - translate_start)
+    
+    def _send_result(self, job: Dict[str, Any], translated_full: str, translate_time: float):
+        """
+        Send the translated result of an OCR'd capture to the UI and cache it.
+        
+        Args:
+            job: OCR'd capture (see _recognize)
+            translated_full: Translation of the combined text
+            translate_time: Seconds spent translating
+        """
+        # Prepare results
+        translations = []
+        for bbox, original_text, confidence in job['ocr_results']:
+            translations.append({
+                'bbox': bbox,
+                'original': original_text,
+                'translated': original_text,
+                'confidence': confidence
             })
+        
+        result_data = {
+            'type': 'result',
+            'region': job['region'],
+            'texts': translations,
+            'full_translation': translated_full,
+            'timing': {
+                'capture': job['capture_time'],
+                'ocr': job['ocr_time'],
+                'translation': translate_time,
+                'total': time.time() - job['start_time']
+            }
+        }
+        
+        if job['frame_key'] is not None:
+            self._store_result(job['frame_key'], result_data)
+        self.result_queue.put(result_data)
+
+    @staticmethod
+    def _drop_stale_regions(regions: List[Dict[str, int]]):
+        """
+        Drop region requests superseded by newer ones.
+        
+        Regions are captured when they are processed, not when requested, so
+        older requests for the same region would only capture the same screen
+        again. Only the newest request per region, and at most
+        TRANSLATE_BATCH_SIZE of the newest regions, are kept.
+        
+        Args:
+            regions: Requested regions, oldest first
+            
+        Returns:
+            (regions to process in request order, number of requests dropped)
+        """
+        newest = {}
+        for i, region in enumerate(regions):
+            newest[(region['x'], region['y'], region['width'], region['height'])] = i
+        keep = sorted(newest.values())[-TRANSLATE_BATCH_SIZE:]
+        return [regions[i] for i in keep], len(regions) - len(keep)
+    
+    def _lookup_result(self, frame_key: tuple) -> Optional[Dict[str, Any]]:
+        """
+        Find the cached result of a recent capture with identical content.
+        
+        Args:
+            frame_key: OCREngine._image_key() of the new capture
+            
+        Returns:
+            Cached result dictionary, or None if no recent capture matches
+        """
+        cached = self._result_cache.get(frame_key)
+        if cached is not None:
+            self._result_cache.move_to_end(frame_key)
+        return cached
+    
+    def _store_result(self, frame_key: tuple, result_data: Dict[str, Any]):
+        """Remember a capture result, evicting the least recently used entry when full"""
+        self._result_cache[frame_key] = result_data
+        self._result_cache.move_to_end(frame_key)
+        if len(self._result_cache) > RESULT_CACHE_SIZE:
+            self._result_cache.popitem(last=False)
 
     def run(self):
         """
         Main loop for the processing pipeline.
         Runs in a separate process.
         """
+        if os.environ.get('SCREENTRANS_DEBUG'):
+            self._start_debug_log()
+        
         print("Processing pipeline started")
         
         # Initialize engines in this process
         self.initialize_engines()
         
+        # Command taken off the queue while batching, handled next
+        next_command = None
+        
         # Main processing loop
         while self.running:
             try:
-                # Wait for commands from UI (with timeout to allow clean shutdown)
-                if not self.command_queue.empty():
-                    command = self.command_queue.get(timeout=0.1)
-                    print(f"DEBUG: Pipeline received command: {command['type']}")
-                    
-                    if command['type'] == 'process_region':
-                        self.process_region(command['region'])
-                    
-                    elif command['type'] == 'process_scrolling_region':
-                        self.process_scrolling_region(command['region'])
-                    
-                    elif command['type'] == 'shutdown':
-                        print("Shutdown command received")
-                        self.running = False
-                        break
+                if next_command is not None:
+                    command, next_command = next_command, None
+                else:
+                    # Block until the UI sends a command (the timeout lets the
+                    # loop re-check self.running)
+                    try:
+                        command = self.command_queue.get(timeout=0.5)
+                    except queue.Empty:
+                        continue
+                logger.debug("Pipeline received command: %s", command['type'])
+                
+                if command['type'] == 'process_region':
+                    # Region requests that queued up meanwhile are
+                    # translated together, minus the stale ones
+                    regions = [command['region']]
+                    while True:
+                        try:
+                            queued = self.command_queue.get_nowait()
+                        except queue.Empty:
+                            break
+                        if queued['type'] != 'process_region':
+                            next_command = queued
+                            break
+                        regions.append(queued['region'])
                     
-                    elif command['type'] == 'reload_config':
-                        self.reload_config()
+                    regions, dropped = self._drop_stale_regions(regions)
+                    if dropped:
+                        logger.debug("Dropped %d stale region requests", dropped)
+                        self.result_queue.put({
+                            'type': 'dropped',
+                            'count': dropped
+                        })
+                    self.process_regions(regions)
                 
-                else:
-                    # Small sleep to prevent busy waiting
-                    time.sleep(0.01)
+                elif command['type'] == 'process_scrolling_region':
+                    self.process_scrolling_region(command['region'])
+                
+                elif command['type'] == 'shutdown':
+                    print("Shutdown command received")
+                    self.running = False
+                    break
+                
+                elif command['type'] == 'reload_config':
+                    self.reload_config()
                     
             except Exception as e:
                 print(f"Error in processing loop: {e}")
@@ -245,8 +516,64 @@ class ProcessingPipeline(Process):
         # Cleanup
         if self.screen_capture:
             self.screen_capture.close()
+        if self.ocr_engine:
+            self.ocr_engine.close()
+        if self.translator:
+            self.translator.close()
         
         print("Processing pipeline stopped")
+        
+        if self._log_listener:
+            self._log_listener.stop()
+    
+    def _start_debug_log(self):
+        """
+        Log debug messages to the console and DEBUG_LOG_PATH from a background
+        thread, so capture, OCR and translation never wait on console or
+        disk IO.
+        """
+        import logging.handlers
+        
+        log_queue = queue.SimpleQueue()
+        formatter = logging.Formatter('%(asctime)s %(name)s: %(message)s')
+        handlers = [
+            logging.StreamHandler(),
+            logging.FileHandler(DEBUG_LOG_PATH, encoding='utf-8', delay=True)
+        ]
+        for handler in handlers:
+            handler.setFormatter(formatter)
+        
+        self._log_listener = logging.handlers.QueueListener(log_queue, *handlers)
+        self._log_listener.start()
+        
+        root = logging.getLogger()
+        root.addHandler(logging.handlers.QueueHandler(log_queue))
+        root.setLevel(logging.DEBUG)
+    
+    def warmup(self):
+        """
+        Run OCR once on a small page of text so Tesseract's language data is
+        loaded and every parallel OCR worker exists before the first real
+        capture.
+        
+        The translators are web services with no local model to preheat, so
+        a dummy translation would only spend API quota.
+        """
+        try:
+            import cv2
+            from ocr_engine import OCR_WORKERS, MIN_TILE_HEIGHT
+            
+            start_time = time.time()
+            # Tall enough to be split into one tile per worker, with a line of
+            # text in every tile (blank images are not OCR'd at all)
+            page = np.full((MIN_TILE_HEIGHT * OCR_WORKERS, 256), 255, dtype=np.uint8)
+            for y in range(40, page.shape[0], MIN_TILE_HEIGHT):
+                cv2.putText(page, "Warmup", (10, y), cv2.FONT_HERSHEY_SIMPLEX, 1, 0, 2)
+            
+            self.ocr_engine.detect_and_recognize_tiled(page)
+            print(f"✓ OCR warmup done in {time.time() - start_time:.2f}s")
+        except Exception as e:
+            print(f"OCR warmup failed: {e}")
     
     def reload_config(self):
         """Reload configuration and re-initialize translator"""
@@ -255,31 +582,32 @@ class ProcessingPipeline(Process):
         print("="*60)
         try:
             from translator import Translator
-            import json
-            import os
+            from config import load_config, CONFIG_PATH
             
             # Load config to get all settings
-            config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    config = json.load(f)
-                    self.source_lang = config.get('source_lang', self.source_lang)
-                    self.target_lang = config.get('target_lang', self.target_lang)
-                    
-                    # Log the configuration being loaded
-                    print(f"Config loaded from: {config_path}")
-                    print(f"  Translation Engine: {config.get('translation_engine', 'google')}")
-                    print(f"  Source Language: {self.source_lang}")
-                    print(f"  Target Language: {self.target_lang}")
-                    prompt = config.get('custom_prompt', '')
-                    print(f"  Custom Prompt: {prompt[:60]}{'...' if len(prompt) > 60 else ''}")
+            config = load_config()
+            if config:
+                self.source_lang = config.get('source_lang', self.source_lang)
+                self.target_lang = config.get('target_lang', self.target_lang)
+                
+                # Log the configuration being loaded
+                print(f"Config loaded from: {CONFIG_PATH}")
+                print(f"  Translation Engine: {config.get('translation_engine', 'google')}")
+                print(f"  Source Language: {self.source_lang}")
+                print(f"  Target Language: {self.target_lang}")
+                prompt = config.get('custom_prompt', '')
+                print(f"  Custom Prompt: {prompt[:60]}{'...' if len(prompt) > 60 else ''}")
             
             # IMPORTANT: Delete old translator instance first
             # This ensures we're not holding onto old configuration
             if self.translator:
+                self.translator.close()
                 del self.translator
                 print("Old translator instance deleted")
             
+            # Cached results were produced with the old settings
+            self._result_cache.clear()
+            
             # Create a completely new Translator instance
             # This forces the Translator to reload its config from disk,
             # picking up changes to translation_engine, gemini_api_key, and custom_prompt
@@ -2,6 +2,11 @@ import cv2
 import numpy as np
 from typing import Optional, Tuple, List
 
+# Overlap search runs on images downscaled by 2**PYRAMID_LEVELS first
+PYRAMID_LEVELS = 2
+# Rows around the coarse match searched again at full resolution
+REFINE_MARGIN = 8
+
 class ImageStitcher:
     """
     Helper class to stitch vertical screenshots together.
@@ -24,29 +29,68 @@ class ImageStitcher:
         if len(images) == 1:
             return images[0]
         
-        result = images[0]
+        # Each image is converted to grayscale once and matched against the
+        # previous one; the bottom of the stitched result is always the
+        # bottom of the previous image
+        offsets = [0]
+        prev_gray = ImageStitcher.to_gray(images[0])
         
-        for i in range(1, len(images)):
-            result = ImageStitcher._stitch_two(result, images[i])
-            
-        return result
+        for image in images[1:]:
+            gray = ImageStitcher.to_gray(image)
+            offsets.append(ImageStitcher.find_overlap(prev_gray, gray))
+            prev_gray = gray
+        
+        # Copy the new rows of every image once into the final image, without
+        # holding any intermediate strips
+        heights = [image.shape[0] - offset for image, offset in zip(images, offsets)]
+        stitched = np.empty((sum(heights),) + images[0].shape[1:], dtype=images[0].dtype)
+        top = 0
+        for image, offset, rows in zip(images, offsets, heights):
+            stitched[top:top + rows] = image[offset:]
+            top += rows
+        return stitched
     
     @staticmethod
-    def _stitch_two(img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+    def stitch_pair(stitched: np.ndarray, image: np.ndarray) -> np.ndarray:
         """
-        Stitch two images vertically by finding overlap.
-        img1 is above img2.
+        Append one image below an already stitched result.
+        
+        Args:
+            stitched: Image stitched so far (BGR)
+            image: Next image to append (BGR)
+            
+        Returns:
+            New stitched image
         """
-        # Convert to grayscale for matching
-        gray1 = cv2.cvtColor(img1, cv2.COLOR_BGR2GRAY)
-        gray2 = cv2.cvtColor(img2, cv2.COLOR_BGR2GRAY)
+        return ImageStitcher._stitch_two(stitched, image)
+    
+    @staticmethod
+    def to_gray(image: np.ndarray) -> np.ndarray:
+        """Convert a BGR/BGRA image to grayscale for matching (gray images pass through)"""
+        if image.ndim == 2:
+            return image
+        code = cv2.COLOR_BGRA2GRAY if image.shape[2] == 4 else cv2.COLOR_BGR2GRAY
+        return cv2.cvtColor(image, code)
+    
+    @staticmethod
+    def find_overlap(gray1: np.ndarray, gray2: np.ndarray) -> int:
+        """
+        Find how many rows at the top of gray2 repeat the bottom of gray1.
         
-        h1, w1 = gray1.shape
-        h2, w2 = gray2.shape
+        Args:
+            gray1: Grayscale image above (only its bottom rows are used)
+            gray2: Grayscale image below
+            
+        Returns:
+            Number of rows to drop from the top of the lower image
+            (0 if no confident match was found)
+        """
+        h1 = gray1.shape[0]
+        h2 = gray2.shape[0]
         
         # We assume the overlap is at the bottom of img1 and top of img2
-        # Take the bottom 20% of img1 as template
-        search_h = int(h1 * 0.2)
+        # Take the bottom 20% of a page as template
+        search_h = int(min(h1, h2) * 0.2)
         if search_h < 10: search_h = 10 # Minimum height
         
         template = gray1[h1-search_h:h1, :]
@@ -57,62 +101,115 @@ class ImageStitcher:
         
         # Match template
         try:
-            res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
-            min_val, max_val, min_loc, max_loc = cv2.minMaxLoc(res)
+            # A scroll only moves rows vertically, so first look for the
+            # offset by correlating per-row means (1D, cheap) and confirm it
+            # with a single full-resolution comparison
+            max_val = -1.0
+            match_y = ImageStitcher._row_profile_match(search_area, template)
+            if match_y is not None:
+                max_val = ImageStitcher._correlation(
+                    search_area[match_y:match_y + search_h], template)
+            
+            if max_val <= 0.8:
+                scale = 1 << PYRAMID_LEVELS
+                if min(template.shape) >= 8 * scale:
+                    # Coarse-to-fine: locate the match on downscaled images,
+                    # then refine it at full resolution within a few rows
+                    small_search, small_template = search_area, template
+                    for _ in range(PYRAMID_LEVELS):
+                        small_search = cv2.pyrDown(small_search)
+                        small_template = cv2.pyrDown(small_template)
+                    _, coarse_y = ImageStitcher._best_match(small_search, small_template)
+                    
+                    y0 = max(0, coarse_y * scale - REFINE_MARGIN)
+                    y1 = max(y0, min(search_area_h - search_h, coarse_y * scale + REFINE_MARGIN))
+                    max_val, match_y = ImageStitcher._best_match(
+                        search_area[y0:y1 + search_h], template)
+                    match_y += y0
+                else:
+                    max_val, match_y = ImageStitcher._best_match(search_area, template)
             
             # Check confidence (threshold 0.8)
             if max_val > 0.8:
-                # Found match
-                match_y = max_loc[1]
-                
-                # The overlap amount in img2 is match_y + search_h
-                # We want to keep img2 starting from match_y + search_h
-                # Wait, let's trace:
-                # template is img1[h1-search_h : h1]
-                # it matches at search_area[match_y : match_y+search_h]
-                # So img2[match_y : match_y+search_h] is the same as img1 bottom.
-                # The part of img2 ABOVE match_y is ... wait.
-                # If img2 is the result of scrolling DOWN, then the top of img2 should overlap with bottom of img1.
-                # So the template (bottom of img1) should be found somewhere in img2.
-                # If found at match_y, it means img2[match_y : match_y+search_h] == template.
-                # So img2[0 : match_y] is content that was in img1 (above the template)? 
-                # No, usually scrolling moves content UP.
-                # So bottom of img1 is now at top of img2.
-                # So we expect match_y to be close to 0.
-                
-                # Overlap region in img2 ends at match_y + search_h.
-                # So we keep img2 from (match_y + search_h) onwards?
-                # No, that would discard the matched part (which is fine, it's in img1)
-                # AND anything above it in img2?
-                
-                # Let's visualize:
+                # Scrolling down moves the bottom of img1 (the template) up to
+                # match_y in img2, so img2 is new content below match_y + search_h:
                 # Img1: [ A ]
                 #       [ B ] <- Template
                 #
                 # Img2: [ B ] <- Match found here (match_y = 0)
                 #       [ C ]
-                
-                # If match_y > 0, it means there is some content X above B in Img2:
-                # Img2: [ X ]
-                #       [ B ]
-                # This implies we scrolled UP? Or captured something we missed?
-                # Usually in "scroll down", the content moves up.
-                # So the bottom of screen (B) moves to top of screen.
-                
-                cut_index = match_y + search_h
-                
-                # Crop img2
-                img2_cropped = img2[cut_index:, :]
-                
-                # Concatenate
-                return np.vstack((img1, img2_cropped))
+                return match_y + search_h
             else:
-                # No good match found, just append?
-                # Or maybe the scroll was larger than screen height (unlikely)
-                # For safety, let's just append with a visual separator or just append
+                # No good match found (maybe the scroll was larger than the
+                # screen height), just append
                 print(f"Stitching warning: Low match confidence ({max_val:.2f}). Appending directly.")
-                return np.vstack((img1, img2))
+                return 0
                 
         except Exception as e:
             print(f"Stitching error: {e}")
-            return np.vstack((img1, img2))
+            return 0
+    
+    @staticmethod
+    def _row_profile_match(search_area: np.ndarray, template: np.ndarray) -> Optional[int]:
+        """
+        Find the vertical offset where the template's row means correlate best
+        with the search area's (normalized cross-correlation in 1D).
+        
+        Returns:
+            Row of the best match, or None if the template rows are all alike
+            (e.g. blank), which leaves nothing to correlate
+        """
+        template_profile = ImageStitcher._row_means(template)
+        template_profile -= template_profile.mean()
+        template_norm = np.linalg.norm(template_profile)
+        if template_norm < 1e-6:
+            return None
+        
+        # One window of the search area's row profile per candidate offset
+        windows = np.lib.stride_tricks.sliding_window_view(
+            ImageStitcher._row_means(search_area), len(template_profile))
+        windows = windows - windows.mean(axis=1, keepdims=True)
+        norms = np.linalg.norm(windows, axis=1) * template_norm
+        corr = windows @ template_profile / np.maximum(norms, 1e-6)
+        return int(np.argmax(corr))
+    
+    @staticmethod
+    def _row_means(gray: np.ndarray) -> np.ndarray:
+        """Mean of every row of a grayscale image, as a float64 vector"""
+        return cv2.reduce(gray, 1, cv2.REDUCE_AVG, dtype=cv2.CV_32F).ravel().astype(np.float64)
+    
+    @staticmethod
+    def _correlation(a: np.ndarray, b: np.ndarray) -> float:
+        """
+        TM_CCOEFF_NORMED score of two same-sized images (matchTemplate at a
+        single position is dominated by its setup cost)
+        """
+        a = a.astype(np.float32)
+        b = b.astype(np.float32)
+        a -= a.mean()
+        b -= b.mean()
+        denom = np.sqrt(float((a * a).sum()) * float((b * b).sum()))
+        return float((a * b).sum()) / denom if denom > 0 else 0.0
+    
+    @staticmethod
+    def _best_match(search_area: np.ndarray, template: np.ndarray) -> Tuple[float, int]:
+        """
+        Find where a full-width template matches best in a search area.
+        
+        Returns:
+            (match confidence, row of the match)
+        """
+        res = cv2.matchTemplate(search_area, template, cv2.TM_CCOEFF_NORMED)
+        _, max_val, _, max_loc = cv2.minMaxLoc(res)
+        return max_val, max_loc[1]
+    
+    @staticmethod
+    def _stitch_two(img1: np.ndarray, img2: np.ndarray) -> np.ndarray:
+        """
+        Stitch two images vertically by finding overlap.
+        img1 is above img2.
+        """
+        # Only the bottom of img1 takes part in the match
+        cut_index = ImageStitcher.find_overlap(ImageStitcher.to_gray(img1[-img2.shape[0]:]),
+                                               ImageStitcher.to_gray(img2))
+        return np.vstack((img1, img2[cut_index:, :]))
@@ -0,0 +1,165 @@
+"""
+Cache of finished translations, in memory and in a SQLite file that
+persists across runs
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+
+from config import CACHE_DIR
+
+# SQLite file holding translations from earlier runs
+TRANSLATION_DB_PATH = os.path.join(CACHE_DIR, 'translations.db')
+# Number of recent translations also kept in memory
+MEMORY_CACHE_SIZE = 4096
+
+# Cache shared by every Translator in the process (see shared_cache())
+_shared = None
+
+class TranslationCache:
+    """
+    Maps (engine, languages, prompt, text) to the translation a backend
+    returned for it.
+    Recent entries are served from memory; every entry is also written to
+    SQLite so recurring texts are not translated again after a restart.
+    """
+    
+    def __init__(self, path: str = TRANSLATION_DB_PATH):
+        """
+        Open (or create) the cache.
+        
+        Args:
+            path: SQLite file; if it cannot be opened, the cache is in-memory only
+        """
+        # key -> translation, least recently used first
+        self._memory = OrderedDict()
+        # translate_batch translates from several threads
+        self._lock = threading.Lock()
+        
+        self._db = None
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            self._db = sqlite3.connect(path, check_same_thread=False)
+            # WAL: writers do not block readers, and commits do not fsync
+            self._db.execute('PRAGMA journal_mode=WAL')
+            self._db.execute('PRAGMA synchronous=NORMAL')
+            self._db.execute(
+                'CREATE TABLE IF NOT EXISTS translations ('
+                'key BLOB PRIMARY KEY, engine TEXT, src TEXT, tgt TEXT, '
+                'response TEXT, ts INTEGER)'
+            )
+            self._db.commit()
+        except Exception as e:
+            print(f"Translation cache is not persisted: {e}")
+            self._db = None
+    
+    @staticmethod
+    def make_key(text: str, engine: str, source_lang: str, target_lang: str,
+                 prompt: str = '') -> bytes:
+        """
+        Build the cache key of a translation request.
+        
+        Args:
+            text: Text to translate
+            engine: Backend (and mode) that translates it, e.g. 'google'
+            source_lang: Source language code
+            target_lang: Target language code
+            prompt: Prompt sent along with the text (Gemini), '' if none
+        
+        Returns:
+            16-byte digest
+        """
+        digest = hashlib.blake2b(digest_size=16)
+        for part in (engine, source_lang, target_lang, prompt, text):
+            digest.update(part.encode('utf-8'))
+            digest.update(b'\0')
+        return digest.digest()
+    
+    def get(self, key: bytes) -> Optional[str]:
+        """
+        Look up a translation.
+        
+        Args:
+            key: Key from make_key()
+        
+        Returns:
+            Cached translation, or None
+        """
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+                return response
+            
+            if self._db is None:
+                return None
+            
+            try:
+                row = self._db.execute(
+                    'SELECT response FROM translations WHERE key = ?', (key,)
+                ).fetchone()
+            except Exception as e:
+                print(f"Translation cache read error: {e}")
+                return None
+            
+            if row is None:
+                return None
+            self._remember(key, row[0])
+            return row[0]
+    
+    def put(self, key: bytes, response: str, engine: str = '', source_lang: str = '',
+            target_lang: str = ''):
+        """
+        Store a translation.
+        
+        Args:
+            key: Key from make_key()
+            response: Translation to cache
+            engine, source_lang, target_lang: Stored alongside for inspection
+        """
+        with self._lock:
+            self._remember(key, response)
+            
+            if self._db is None:
+                return
+            
+            try:
+                self._db.execute(
+                    'INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)',
+                    (key, engine, source_lang, target_lang, response, int(time.time()))
+                )
+                self._db.commit()
+            except Exception as e:
+                print(f"Translation cache write error: {e}")
+    
+    def _remember(self, key: bytes, response: str):
+        """Keep a translation in memory, evicting the least recently used one when full"""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        if len(self._memory) > MEMORY_CACHE_SIZE:
+            self._memory.popitem(last=False)
+    
+    def close(self):
+        """Close the SQLite file"""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+def shared_cache() -> TranslationCache:
+    """
+    Get the process-wide translation cache, opening it on first use.
+    
+    Translator instances are recreated whenever the config is reloaded; the
+    cache outlives them (its keys include the engine, languages and prompt).
+    """
+    global _shared
+    if _shared is None:
+        _shared = TranslationCache()
+    return _shared
@@ -2,9 +2,28 @@
 Translation module supporting both Google Translate and Gemini AI
 """
 
-from typing import List, Optional
-import json
-import os
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Tuple
+
+import cv2
+
+from config import load_config
+from translation_cache import TranslationCache, shared_cache
+
+# Requests translate_batch sends at once. Gemini is kept low to stay under
+# its per-minute quota.
+GOOGLE_BATCH_WORKERS = 8
+GEMINI_BATCH_WORKERS = 2
+# Google Translate endpoint queried over a kept-alive connection
+GOOGLE_TRANSLATE_URL = 'https://translate.googleapis.com/translate_a/single'
+# translate_batch packs texts into one Gemini request, up to this many texts
+# or characters, so the numbered reply stays within the output token limit
+GEMINI_PACK_SIZE = 100
+GEMINI_PACK_CHARS = 8000
+# Start of a numbered line ("12. ") in a packed Gemini reply
+_NUMBERED_LINE = re.compile(r'^(\d+)\.\s', re.MULTILINE)
 
 class Translator:
     """
@@ -27,6 +46,15 @@ class Translator:
         self.gemini_model = None
         self.translator = None
         
+        # Translations from this and earlier runs
+        self.cache = shared_cache()
+        
+        # Per-thread HTTP sessions and GoogleTranslator instances
+        self._local = threading.local()
+        # translate_batch threads, created on first use and kept so their
+        # connections stay open between batches
+        self._executor = None
+        
         # Load config
         self.config = self._load_config()
         
@@ -42,10 +70,9 @@ class Translator:
     def _load_config(self):
         """Load configuration from config.json"""
         try:
-            config_path = os.path.join(os.path.dirname(__file__), '..', 'config.json')
-            if os.path.exists(config_path):
-                with open(config_path, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+            config = load_config()
+            if config:
+                return config
         except Exception as e:
             print(f"Error loading config: {e}")
         
@@ -174,30 +201,49 @@ class Translator:
         if self.engine_type == 'gemini' and self.gemini_model:
             # Use vision mode if image is provided and mode is vision
             if image is not None and hasattr(self, 'gemini_mode') and self.gemini_mode == 'vision':
-                return self._translate_with_gemini_vision(text, image, prompt)
+                engine = 'gemini-vision'
             else:
-                return self._translate_with_gemini(text, prompt)
+                engine = 'gemini'
         elif self.translator:
-            return self._translate_with_google(text)
+            engine = 'google'
         else:
             return text
+        
+        # The same text was translated before with the same settings
+        # (for vision mode, its OCR text stands in for the image)
+        cache_prompt = '' if engine == 'google' else (prompt or self.custom_prompt)
+        key = TranslationCache.make_key(text, engine, self.source_lang, self.target_lang, cache_prompt)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        
+        if engine == 'gemini-vision':
+            result, produced_by = self._translate_with_gemini_vision(text, image, prompt)
+        elif engine == 'gemini':
+            result, produced_by = self._translate_with_gemini(text, prompt)
+        else:
+            result, produced_by = self._translate_with_google(text), 'google'
+        
+        # Failed translations come back as the original text, and a fallback
+        # engine's translation must not be served once the keyed engine
+        # works again; don't keep either
+        if produced_by == engine and result and result != text:
+            self.cache.put(key, result, engine, self.source_lang, self.target_lang)
+        return result
 
-    def _translate_with_gemini_vision(self, text: str, image, prompt_override=None) -> str:
-        """Translate using Gemini Vision (send image)"""
+    def _translate_with_gemini_vision(self, text: str, image, prompt_override=None) -> Tuple[str, str]:
+        """
+        Translate using Gemini Vision (send image).
+        
+        Returns:
+            (translation, engine that produced it): 'gemini-vision', or that of
+            the text-mode fallback (see _translate_with_gemini)
+        """
         try:
-            import google.generativeai as genai
-            from PIL import Image
-            import io
-            import cv2
-            
-            # Convert BGR numpy array to PIL Image
-            image_rgb = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
-            pil_image = Image.fromarray(image_rgb)
-            
             # Resize image if too large (WebP limit is 16383 pixels)
             # Also reduce size to save API quota
             max_dimension = 2048  # Reasonable size for OCR
-            width, height = pil_image.size
+            height, width = image.shape[:2]
             
             if width > max_dimension or height > max_dimension:
                 # Calculate scaling factor
@@ -206,20 +252,27 @@ class Translator:
                 new_height = int(height * scale)
                 
                 print(f"Resizing image from {width}x{height} to {new_width}x{new_height}")
-                pil_image = pil_image.resize((new_width, new_height), Image.Resampling.LANCZOS)
+                image = cv2.resize(image, (new_width, new_height), interpolation=cv2.INTER_AREA)
             
             # Build prompt with custom context
             base_prompt = prompt_override if prompt_override else self.custom_prompt
             prompt = f"{base_prompt}\n\n(Hình ảnh chứa text cần dịch)"
             
+            # Send the image as JPEG: much smaller to upload than PNG.
+            # OpenCV encodes the BGR array directly, no RGB copy needed.
+            ok, buffer = cv2.imencode('.jpg', image, [cv2.IMWRITE_JPEG_QUALITY, 85])
+            if not ok:
+                raise ValueError("could not encode image as JPEG")
+            image_part = {'mime_type': 'image/jpeg', 'data': buffer.tobytes()}
+            
             # Generate content with image
-            response = self.gemini_model.generate_content([prompt, pil_image])
+            response = self.gemini_model.generate_content([prompt, image_part])
             
             # Check if response has text (might be blocked by safety filters)
             if hasattr(response, 'text'):
-                return response.text.strip()
+                return response.text.strip(), 'gemini-vision'
             elif hasattr(response, 'parts'):
-                return response.parts[0].text.strip()
+                return response.parts[0].text.strip(), 'gemini-vision'
             else:
                 print("Gemini Vision response blocked or empty, falling back to text mode")
                 return self._translate_with_gemini(text, prompt_override)
@@ -229,8 +282,14 @@ class Translator:
             # Fallback to text mode
             return self._translate_with_gemini(text, prompt_override)
 
-    def _translate_with_gemini(self, text: str, prompt_override=None) -> str:
-        """Translate using Gemini AI (text only)"""
+    def _translate_with_gemini(self, text: str, prompt_override=None) -> Tuple[str, str]:
+        """
+        Translate using Gemini AI (text only).
+        
+        Returns:
+            (translation, engine that produced it): 'gemini', or 'google' if
+            Gemini failed and Google Translate was used instead
+        """
         try:
             # Build prompt with custom context
             base_prompt = prompt_override if prompt_override else self.custom_prompt
@@ -241,49 +300,200 @@ class Translator:
             
             # Check if response has text (might be blocked by safety filters)
             if hasattr(response, 'text'):
-                return response.text.strip()
+                return response.text.strip(), 'gemini'
             elif hasattr(response, 'parts'):
-                return response.parts[0].text.strip()
+                return response.parts[0].text.strip(), 'gemini'
             else:
                 print("Gemini response blocked or empty")
-                return self._translate_with_google(text)
+                return self._translate_with_google(text), 'google'
             
         except Exception as e:
             print(f"Gemini translation error: {e}")
             # Fallback to Google Translate
-            return self._translate_with_google(text)
+            return self._translate_with_google(text), 'google'
     
     def _translate_with_google(self, text: str) -> str:
         """Translate using Google Translate"""
         try:
-            return self.translator.translate(text)
+            return self._translate_with_google_api(text)
+        except Exception as e:
+            print(f"Google Translate API error, retrying with deep_translator: {e}")
+        
+        try:
+            return self._google_translator().translate(text)
         except Exception as e:
             print(f"Google Translate error: {e}")
             return text
     
+    def _translate_with_google_api(self, text: str) -> str:
+        """
+        Translate with one request to the Google Translate API.
+        
+        deep_translator opens a new connection (TCP + TLS handshake) for every
+        call; a requests.Session per thread keeps the connection alive between
+        translations.
+        """
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            import requests
+            session = requests.Session()
+            self._local.session = session
+        
+        # The text goes in a form-encoded POST body: stitched scrolling
+        # captures can be far longer than the endpoint accepts in a URL
+        response = session.post(GOOGLE_TRANSLATE_URL, params={
+            'client': 'gtx',
+            'sl': self.source_lang,
+            'tl': self.target_lang,
+            'dt': 't'
+        }, data={'q': text}, timeout=10)
+        response.raise_for_status()
+        
+        # [[[translated sentence, original sentence, ...], ...], ...]
+        sentences = response.json()[0]
+        return "".join([sentence[0] for sentence in sentences if sentence[0]])
+    
+    def _google_translator(self):
+        """
+        GoogleTranslator for the calling thread. It keeps each request's
+        query on the instance, so threads must not share one.
+        """
+        if threading.current_thread() is threading.main_thread():
+            return self.translator
+        
+        translator = getattr(self._local, 'google', None)
+        if translator is None:
+            from deep_translator import GoogleTranslator
+            translator = GoogleTranslator(source=self.source_lang, target=self.target_lang)
+            self._local.google = translator
+        return translator
+    
     def translate_batch(self, texts: List[str], beam_size: int = 2) -> List[str]:
         """
         Translate multiple texts.
-        Note: For Gemini, we translate individually to avoid token limits.
+        With Gemini, texts are packed as numbered lines into as few requests
+        as possible; otherwise each text is a separate request. The requests
+        are sent concurrently since they mostly wait on the network.
         
         Args:
             texts: List of texts to translate
             beam_size: Ignored
-            
+        
         Returns:
-            List[str]: List of translated texts
+            List[str]: List of translated texts, in the same order
         """
         if not texts:
             return []
         
-        # For batch, just translate each individually
-        # (Gemini has token limits, Google Translate is fast enough)
-        results = []
-        for text in texts:
-            results.append(self.translate(text))
+        if len(texts) == 1:
+            return [self.translate(texts[0])]
+        
+        if self._executor is None:
+            workers = GEMINI_BATCH_WORKERS if self.engine_type == 'gemini' else GOOGLE_BATCH_WORKERS
+            self._executor = ThreadPoolExecutor(max_workers=workers)
+        
+        if self.engine_type == 'gemini' and self.gemini_model:
+            return self._translate_batch_with_gemini(texts)
+        return list(self._executor.map(self.translate, texts))
+    
+    def _translate_batch_with_gemini(self, texts: List[str]) -> List[str]:
+        """
+        Translate texts with Gemini, several per request.
+        
+        Args:
+            texts: List of texts to translate
+        
+        Returns:
+            List[str]: List of translated texts, in the same order
+        """
+        results = list(texts)
+        keys = {}
+        
+        # Texts not translated before, in packs of GEMINI_PACK_SIZE texts
+        # or GEMINI_PACK_CHARS characters
+        packs = [[]]
+        pack_chars = 0
+        for i, text in enumerate(texts):
+            if not text or not text.strip():
+                continue
+            
+            keys[i] = TranslationCache.make_key(text, 'gemini', self.source_lang, self.target_lang,
+                                                self.custom_prompt)
+            cached = self.cache.get(keys[i])
+            if cached is not None:
+                results[i] = cached
+                continue
+            
+            if packs[-1] and (len(packs[-1]) >= GEMINI_PACK_SIZE
+                              or pack_chars + len(text) > GEMINI_PACK_CHARS):
+                packs.append([])
+                pack_chars = 0
+            packs[-1].append(i)
+            pack_chars += len(text)
+        
+        packs = [pack for pack in packs if pack]
+        translated_packs = self._executor.map(
+            lambda pack: self._translate_pack_with_gemini([texts[i] for i in pack]), packs
+        )
+        
+        for pack, translations in zip(packs, translated_packs):
+            for i, (result, produced_by) in zip(pack, translations):
+                results[i] = result
+                # As in translate(): keep only Gemini's own translations
+                if produced_by == 'gemini' and result and result != texts[i]:
+                    self.cache.put(keys[i], result, 'gemini', self.source_lang, self.target_lang)
         
         return results
     
+    def _translate_pack_with_gemini(self, texts: List[str]) -> List[Tuple[str, str]]:
+        """
+        Translate texts with one Gemini request, sent as numbered lines.
+        Falls back to one request per text if the reply can't be matched
+        up with the texts.
+        
+        Args:
+            texts: List of texts to translate
+        
+        Returns:
+            (translation, engine that produced it) per text, in the same
+            order (see _translate_with_gemini)
+        """
+        if len(texts) == 1:
+            return [self._translate_with_gemini(texts[0])]
+        
+        try:
+            # Each text must stay on its own numbered line
+            lines = "\n".join(f"{n}. {' '.join(text.split())}" for n, text in enumerate(texts, 1))
+            prompt = (f"{self.custom_prompt}\n\n"
+                      f"Translate each numbered line separately. Keep the numbering "
+                      f"and reply with the translated lines only.\n\n{lines}")
+            
+            response = self.gemini_model.generate_content(prompt)
+            reply = response.text if hasattr(response, 'text') else response.parts[0].text
+            
+            # ['', '1', 'first line', '2', 'second line', ...]
+            parts = _NUMBERED_LINE.split(reply.strip())
+            numbers = [int(number) for number in parts[1::2]]
+            if numbers == list(range(1, len(texts) + 1)):
+                return [(translation.strip(), 'gemini') for translation in parts[2::2]]
+            
+            print(f"Gemini batch reply has {len(numbers)} of {len(texts)} lines, translating one by one")
+        except Exception as e:
+            print(f"Gemini batch translation error, translating one by one: {e}")
+        
+        return [self._translate_with_gemini(text) for text in texts]
+    
+    def close(self):
+        """Stop the translate_batch threads (their HTTP sessions close with them)"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+    
+    def uses_vision(self) -> bool:
+        """Check if translate() will send the captured image (Gemini vision mode)"""
+        return (self.engine_type == 'gemini' and self.gemini_model is not None
+                and getattr(self, 'gemini_mode', None) == 'vision')
+    
     def is_available(self) -> bool:
         """Check if translator is ready"""
         return (self.gemini_model is not None) or (self.translator is not None)
@@ -1,8 +1,9 @@
 from PyQt6.QtWidgets import (QMainWindow, QWidget, QVBoxLayout, QHBoxLayout, 
                              QLabel, QPushButton, QTextEdit, QStackedWidget, QScrollArea)
-from PyQt6.QtCore import Qt, QTimer, QRect, QPoint, pyqtSignal, QSize, QEvent
+from PyQt6.QtCore import Qt, QTimer, QRect, QPoint, pyqtSignal, QSize, QEvent, QObject
 from PyQt6.QtGui import QPainter, QColor, QFont, QPen, QIcon, QAction
 from typing import List, Dict, Any
+import threading
 
 
 class ParagraphCard(QWidget):
@@ -441,6 +442,39 @@ class LoadingWidget(QWidget):
         self.timer.stop()
 
 
+class ResultReceiver(QObject):
+    """
+    Waits on the result queue in a background thread and re-emits each
+    result as a Qt signal, delivered on the GUI thread.
+    """
+    
+    result_received = pyqtSignal(object)
+    
+    def __init__(self, result_queue):
+        """
+        Start the receiver thread.
+        
+        Args:
+            result_queue: Queue to receive results from processing pipeline
+        """
+        super().__init__()
+        self.result_queue = result_queue
+        
+        # Daemon: blocked in get() forever once the pipeline is gone, and must
+        # not keep the application alive
+        self._thread = threading.Thread(target=self._receive_loop, daemon=True)
+        self._thread.start()
+    
+    def _receive_loop(self):
+        """Block on the queue and forward every result to the GUI thread"""
+        while True:
+            try:
+                result = self.result_queue.get()
+            except (EOFError, OSError):
+                break
+            self.result_received.emit(result)
+
+
 class OverlayController:
     """
     Controller for managing the overlay window and processing results.
@@ -457,19 +491,12 @@ class OverlayController:
         self.overlay = OverlayWindow()
         self.loading_widget = LoadingWidget()
         
-        # Timer to check for results
-        self.check_timer = QTimer()
-        self.check_timer.timeout.connect(self.check_results)
-        self.check_timer.start(50)  # Check every 50ms
-    
-    def check_results(self):
-        """Check for new results from the processing pipeline"""
-        while not self.result_queue.empty():
-            try:
-                result = self.result_queue.get_nowait()
-                self.handle_result(result)
-            except:
-                break
+        # Results are pushed from a blocking reader thread instead of polling
+        # the queue on a timer: no wake-ups while idle, no poll-interval delay
+        self.receiver = ResultReceiver(result_queue)
+        self.receiver.result_received.connect(
+            self.handle_result, Qt.ConnectionType.QueuedConnection
+        )
     
     def handle_result(self, result: Dict[str, Any]):
         """
@@ -478,11 +505,16 @@ class OverlayController:
         Args:
             result: Result dictionary from pipeline
         """
+        result_type = result.get('type')
+        
+        # Stale requests were skipped; the newest one is still being processed
+        if result_type == 'dropped':
+            print(f"Skipped {result.get('count', 0)} outdated capture request(s)")
+            return
+        
         # Hide loading indicator when we get any result
         self.loading_widget.stop()
         
-        result_type = result.get('type')
-        
         if result_type == 'init_complete':
             translator_available = result.get('translator_available', False)
             if translator_available:
@@ -26,5 +26,10 @@ class PromptDialog(QDialog):
         
         self.setLayout(layout)
         
+    def reset(self):
+        """Clear the previous prompt so the dialog can be shown again"""
+        self.input_text.clear()
+        self.input_text.setFocus()
+        
     def get_prompt(self):
         return self.input_text.toPlainText().strip()
@@ -6,6 +6,9 @@ from PyQt6.QtWidgets import QWidget, QApplication
 from PyQt6.QtCore import Qt, QRect, QPoint, pyqtSignal
 from PyQt6.QtGui import QPainter, QPen, QColor, QBrush, QScreen
 import sys
+import logging
+
+logger = logging.getLogger(__name__)
 
 
 class SnippingWidget(QWidget):
@@ -31,12 +34,22 @@ class SnippingWidget(QWidget):
         self.end_pos = None
         self.selecting = False
         
-        # Make fullscreen
-        self.showFullScreen()
-        
         # Set cursor
         self.setCursor(Qt.CursorShape.CrossCursor)
     
+    def start(self):
+        """
+        Show the widget fullscreen for a new selection.
+        The widget is only hidden when a selection ends, so it can be reused.
+        """
+        self.start_pos = None
+        self.end_pos = None
+        self.selecting = False
+        
+        self.showFullScreen()
+        self.raise_()
+        self.activateWindow()
+    
     def paintEvent(self, event):
         """Draw the selection rectangle"""
         painter = QPainter(self)
@@ -79,7 +92,7 @@ class SnippingWidget(QWidget):
     def mousePressEvent(self, event):
         """Start selection"""
         if event.button() == Qt.MouseButton.LeftButton:
-            print(f"DEBUG: Mouse press at {event.pos()}")
+            logger.debug("Mouse press at %s", event.pos())
             self.start_pos = event.pos()
             self.end_pos = event.pos()
             self.selecting = True
@@ -94,20 +107,20 @@ class SnippingWidget(QWidget):
     def mouseReleaseEvent(self, event):
         """Finish selection"""
         if event.button() == Qt.MouseButton.LeftButton and self.selecting:
-            print(f"DEBUG: Mouse release at {event.pos()}")
+            logger.debug("Mouse release at %s", event.pos())
             self.selecting = False
             self.end_pos = event.pos()
             
             # Calculate final rectangle
             rect = QRect(self.start_pos, self.end_pos).normalized()
-            print(f"DEBUG: Selection rect: {rect}, size: {rect.width()}x{rect.height()}")
+            logger.debug("Selection rect: %s, size: %dx%d", rect, rect.width(), rect.height())
             
             # Only emit if we have a valid selection (at least 10x10 pixels)
             if rect.width() >= 10 and rect.height() >= 10:
-                print("DEBUG: Emitting region_selected")
+                logger.debug("Emitting region_selected")
                 self.region_selected.emit(rect.x(), rect.y(), rect.width(), rect.height())
             else:
-                print("DEBUG: Selection too small, ignoring")
+                logger.debug("Selection too small, ignoring")
             
             # Close the snipping widget
             self.close()
@@ -137,7 +150,7 @@ def select_region():
     
     snipping = SnippingWidget()
     snipping.region_selected.connect(on_region_selected)
-    snipping.show()
+    snipping.start()
     
     # Wait for the widget to close
     snipping.exec() if hasattr(snipping, 'exec') else app.exec()
@@ -9,9 +9,11 @@ from pathlib import Path
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
-from ocr_engine import OCREngine
+from collections import Counter
+from ocr_engine import OCREngine, TILE_OVERLAP
 import cv2
 import numpy as np
+import pytest
 
 
 def create_test_image():
@@ -87,6 +89,103 @@ def test_ocr():
     return True
 
 
+def start_ocr_engine():
+    """OCREngine on tesserocr; skips the calling test if Tesseract cannot start"""
+    pytest.importorskip('tesserocr')
+    # tesserocr can import without the Tesseract binary or language data
+    try:
+        return OCREngine()
+    except Exception as e:
+        pytest.skip(f"Tesseract is not installed: {e}")
+
+
+def create_mixed_polarity_image():
+    """
+    Create a light window with dark text, a dark header bar and a colored
+    button, both with light text.
+    
+    Returns:
+        (image, words drawn)
+    """
+    img = np.full((360, 900, 3), 245, dtype=np.uint8)
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    cv2.rectangle(img, (0, 0), (900, 70), (40, 40, 40), -1)
+    cv2.putText(img, 'Settings', (30, 48), font, 1.2, (250, 250, 250), 2)
+    cv2.putText(img, 'Window', (30, 160), font, 1.2, (20, 20, 20), 2)
+    cv2.putText(img, 'Keyboard', (30, 240), font, 1.2, (20, 20, 20), 2)
+    cv2.rectangle(img, (600, 270), (860, 340), (150, 80, 20), -1)
+    cv2.putText(img, 'Apply', (650, 318), font, 1.2, (255, 255, 255), 2)
+    return img, {'Settings', 'Window', 'Keyboard', 'Apply'}
+
+
+def test_mixed_polarity_text_is_recognized():
+    """Light-on-dark text next to dark-on-light text is read in both polarities"""
+    ocr = start_ocr_engine()
+    img, words = create_mixed_polarity_image()
+    
+    try:
+        found = {text for _, text, _ in ocr.detect_and_recognize(img)}
+        # Both polarities, also for the inverted majority (a dark theme)
+        found_inverted = {text for _, text, _ in ocr.detect_and_recognize(cv2.bitwise_not(img))}
+    finally:
+        ocr.close()
+    
+    assert words <= found, found
+    assert words <= found_inverted, found_inverted
+
+
+def create_tiled_test_image(tile_height, tiles):
+    """
+    Create a tall test image with words inside tiles and words straddling
+    the boundaries between tiles.
+    
+    Returns:
+        (image, {word: baseline y})
+    """
+    img = np.full((tile_height * tiles, 900, 3), 255, dtype=np.uint8)
+    font = cv2.FONT_HERSHEY_SIMPLEX
+    words = iter(['Alpha', 'Bravo', 'Charlie', 'Delta', 'Echo', 'Foxtrot', 'Golf',
+                  'Hotel', 'India', 'Juliet', 'Kilo', 'Lima'])
+    baselines = {}
+    for tile in range(tiles):
+        seam = tile * tile_height
+        # Inside the tile, and (except for the first tile) across its top edge
+        rows = [seam + tile_height // 2]
+        if tile > 0:
+            rows.append(seam + 12)
+        for y in rows:
+            word = next(words)
+            cv2.putText(img, word, (60 + 200 * (y % 3), y), font, 1.2, (0, 0, 0), 2)
+            baselines[word] = y
+    return img, baselines
+
+
+def test_tiled_ocr_reports_seam_words_once():
+    """Words in the overlap between tiles are reported once, in image coordinates"""
+    ocr = start_ocr_engine()
+    
+    tile_height = 400
+    img, baselines = create_tiled_test_image(tile_height, tiles=4)
+    assert TILE_OVERLAP > 40  # rows the seam words extend into the next tile
+    
+    try:
+        results = ocr.detect_and_recognize_tiled(img, tile_height=tile_height)
+        whole = ocr.detect_and_recognize(img)
+    finally:
+        ocr.close()
+    
+    counts = Counter(text for _, text, _ in results)
+    assert all(count == 1 for count in counts.values()), counts
+    assert set(baselines) <= set(counts)
+    # Tiling finds the same words as OCR'ing the image in one pass
+    assert set(counts) == {text for _, text, _ in whole}
+    
+    for bbox, text, _ in results:
+        if text in baselines:
+            top, bottom = bbox[0][1], bbox[2][1]
+            assert top < baselines[text] <= bottom + 2, (text, bbox)
+
+
 if __name__ == '__main__':
     success = test_ocr()
     sys.exit(0 if success else 1)
@@ -0,0 +1,190 @@
+"""
+Tests for the processing pipeline's handling of region requests
+"""
+
+import sys
+import queue
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import pipeline as pipeline_module
+from pipeline import ProcessingPipeline
+import cv2
+import numpy as np
+
+
+class FakeCapture:
+    """
+    Returns the queued frames in turn instead of grabbing the screen; once
+    they run out, each region shows its own position. Records the regions
+    captured.
+    """
+    
+    def __init__(self, frames=()):
+        self.frames = list(frames)
+        self.regions = []
+    
+    def capture_region(self, x, y, width, height, grayscale=False, reuse_buffer=False):
+        self.regions.append({'x': x, 'y': y, 'width': width, 'height': height})
+        if self.frames:
+            return self.frames.pop(0)
+        return subtitle(f"at {x}, {y}")
+    
+    def close(self):
+        pass
+
+
+class FakeOCR:
+    """Counts OCR passes; each frame reads as its mean brightness"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def detect_and_recognize_tiled(self, image, tile_height=None):
+        self.calls += 1
+        return [([[0, 0], [10, 0], [10, 10], [0, 10]], f"text {int(image.mean())}", 0.9)]
+    
+    def close(self):
+        pass
+
+
+class FakeTranslator:
+    """Upper-cases texts, recording every text it was asked to translate"""
+    
+    def __init__(self):
+        self.translated = []
+        self.batches = []
+    
+    def uses_vision(self):
+        return False
+    
+    def is_available(self):
+        return True
+    
+    def translate(self, text, image=None):
+        self.translated.append(text)
+        return text.upper()
+    
+    def translate_batch(self, texts):
+        self.batches.append(list(texts))
+        self.translated.extend(texts)
+        return [text.upper() for text in texts]
+    
+    def close(self):
+        pass
+
+
+def make_pipeline(frames=()):
+    """Pipeline wired to fake engines, run in this process"""
+    pipeline = ProcessingPipeline(queue.Queue(), queue.Queue())
+    pipeline.screen_capture = FakeCapture(frames)
+    pipeline.ocr_engine = FakeOCR()
+    pipeline.translator = FakeTranslator()
+    return pipeline
+
+
+def subtitle(text):
+    """Grayscale subtitle frame showing text"""
+    frame = np.zeros((60, 400), dtype=np.uint8)
+    cv2.putText(frame, text, (10, 40), cv2.FONT_HERSHEY_SIMPLEX, 1, 255, 2)
+    return frame
+
+
+def results(pipeline):
+    """Results the pipeline has sent to the UI so far"""
+    sent = []
+    while not pipeline.result_queue.empty():
+        sent.append(pipeline.result_queue.get())
+    return sent
+
+
+REGION = {'x': 0, 'y': 0, 'width': 400, 'height': 60}
+
+
+def test_repeated_frame_reuses_result():
+    """An unchanged frame is answered from the cache without OCR or translation"""
+    frame = subtitle("Hello there")
+    pipeline = make_pipeline([frame, frame.copy()])
+    
+    pipeline.process_region(REGION)
+    pipeline.process_region(REGION)
+    
+    first, second = results(pipeline)
+    assert pipeline.ocr_engine.calls == 1
+    assert len(pipeline.translator.translated) == 1
+    assert second['full_translation'] == first['full_translation']
+    assert second['timing']['ocr'] == 0
+
+
+def test_changed_frame_is_not_served_cached_result():
+    """A frame differing by a single word is OCR'd and translated again"""
+    frames = [subtitle("Hello there"), subtitle("Hello where"), subtitle("Hello there")]
+    pipeline = make_pipeline(frames)
+    
+    for _ in frames:
+        pipeline.process_region(REGION)
+    
+    first, second, third = results(pipeline)
+    assert pipeline.ocr_engine.calls == 2
+    assert second['full_translation'] != first['full_translation']
+    # Going back to an earlier frame is still a cache hit
+    assert third['full_translation'] == first['full_translation']
+
+
+def region(x, y=0):
+    """Region of REGION's size at (x, y)"""
+    return {'x': x, 'y': y, 'width': 400, 'height': 60}
+
+
+def test_drop_stale_regions_keeps_newest_request_per_region():
+    """Older requests for a region are dropped; the rest keep their request order"""
+    a, b, c = region(0), region(100), region(200)
+    
+    kept, dropped = ProcessingPipeline._drop_stale_regions([a, b, dict(a), c, dict(b)])
+    
+    assert kept == [a, c, b]
+    assert dropped == 2
+
+
+def test_drop_stale_regions_keeps_newest_batch():
+    """At most TRANSLATE_BATCH_SIZE regions are kept, the most recently requested ones"""
+    regions = [region(x) for x in range(pipeline_module.TRANSLATE_BATCH_SIZE + 3)]
+    
+    kept, dropped = ProcessingPipeline._drop_stale_regions(regions)
+    
+    assert kept == regions[3:]
+    assert dropped == 3
+
+
+def test_queued_requests_are_coalesced_into_one_batch():
+    """
+    Region requests queued while the pipeline was busy are reduced to the
+    newest per region, reported as dropped, and translated in one batch.
+    """
+    pipeline = make_pipeline()
+    pipeline.initialize_engines = lambda: None
+    a, b, c = region(0), region(100), region(200)
+    for requested in (a, b, a, c, b):
+        pipeline.command_queue.put({'type': 'process_region', 'region': requested})
+    pipeline.command_queue.put({'type': 'shutdown'})
+    
+    pipeline.run()
+    
+    sent = results(pipeline)
+    assert sent[0] == {'type': 'dropped', 'count': 2}
+    assert [result['region'] for result in sent[1:]] == [a, c, b]
+    assert pipeline.screen_capture.regions == [a, c, b]
+    assert len(pipeline.translator.batches) == 1
+    assert len(pipeline.translator.batches[0]) == 3
+
+
+if __name__ == '__main__':
+    for test in (test_repeated_frame_reuses_result,
+                 test_changed_frame_is_not_served_cached_result,
+                 test_drop_stale_regions_keeps_newest_request_per_region,
+                 test_drop_stale_regions_keeps_newest_batch,
+                 test_queued_requests_are_coalesced_into_one_batch):
+        test()
+        print(f"✓ {test.__name__}")
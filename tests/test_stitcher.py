@@ -0,0 +1,107 @@
+"""
+Tests for stitching scrolled pages back into one image
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from stitcher import ImageStitcher
+import cv2
+import numpy as np
+import pytest
+
+PAGE_HEIGHT = 300
+WIDTH = 480
+
+
+def text_page(height, seed=0):
+    """Tall BGR page of text lines at irregular positions"""
+    rng = np.random.default_rng(seed)
+    page = np.full((height, WIDTH, 3), 255, dtype=np.uint8)
+    y = 20
+    while y < height:
+        words = " ".join("".join(rng.choice(list("abcdefghijklmnopqrstuvwxyz"), rng.integers(2, 9)))
+                         for _ in range(rng.integers(2, 6)))
+        cv2.putText(page, words, (int(rng.integers(5, 60)), y), cv2.FONT_HERSHEY_SIMPLEX,
+                    0.6, (0, 0, 0), 1)
+        y += int(rng.integers(18, 40))
+    return page
+
+
+def flat_profile_page(height, seed=0):
+    """
+    Tall BGR page whose rows are all shifted copies of one row, so every row
+    has the same mean and the row profile says nothing about the scroll offset
+    """
+    rng = np.random.default_rng(seed)
+    row = cv2.GaussianBlur(rng.integers(0, 256, (1, WIDTH)).astype(np.uint8), (0, 0), 3)[0]
+    row = cv2.normalize(row, None, 0, 255, cv2.NORM_MINMAX).ravel()
+    # Neighbouring rows are shifted by a few pixels, so the texture stays
+    # smooth vertically and survives downscaling
+    shifts = np.cumsum(rng.integers(-3, 4, height))
+    gray = np.stack([np.roll(row, shift) for shift in shifts])
+    return cv2.cvtColor(gray, cv2.COLOR_GRAY2BGR)
+
+
+def scrolled_pages(source, step):
+    """Page-sized crops of source, each scrolled step rows below the previous one"""
+    return [source[top:top + PAGE_HEIGHT] for top in range(0, source.shape[0] - PAGE_HEIGHT + 1, step)]
+
+
+@pytest.mark.parametrize('step', [150, 180, 210, 240])
+def test_stitching_scrolled_pages_restores_source(step):
+    """Overlapping crops of a text page stitch back into the page itself"""
+    source = text_page(PAGE_HEIGHT + 5 * step, seed=step)
+    pages = scrolled_pages(source, step)
+    
+    stitched = ImageStitcher.stitch_images(pages)
+    
+    assert stitched.shape == source.shape
+    assert np.array_equal(stitched, source)
+
+
+def test_stitch_pair_restores_source():
+    """Appending pages one at a time gives the same result as stitch_images"""
+    source = text_page(PAGE_HEIGHT + 3 * 200, seed=1)
+    pages = scrolled_pages(source, 200)
+    
+    stitched = pages[0]
+    for page in pages[1:]:
+        stitched = ImageStitcher.stitch_pair(stitched, page)
+    
+    assert np.array_equal(stitched, source)
+
+
+def test_flat_row_profile_falls_back_to_pyramid_search(monkeypatch):
+    """
+    When the row profile cannot locate the overlap, the pyramid search
+    still finds it
+    """
+    calls = []
+    best_match = ImageStitcher._best_match
+    
+    def recording_best_match(search_area, template):
+        calls.append(search_area.shape)
+        return best_match(search_area, template)
+    
+    monkeypatch.setattr(ImageStitcher, '_best_match', staticmethod(recording_best_match))
+    source = flat_profile_page(PAGE_HEIGHT + 3 * 200, seed=2)
+    pages = scrolled_pages(source, 200)
+    
+    stitched = ImageStitcher.stitch_images(pages)
+    
+    assert calls, "the pyramid search was not used"
+    assert np.array_equal(stitched, source)
+
+
+def test_unrelated_pages_are_appended():
+    """Pages with no overlap are appended whole"""
+    first = text_page(PAGE_HEIGHT, seed=3)
+    second = flat_profile_page(PAGE_HEIGHT, seed=4)
+    
+    stitched = ImageStitcher.stitch_images([first, second])
+    
+    assert np.array_equal(stitched, np.concatenate([first, second]))
@@ -2,13 +2,18 @@
 Test script for translation functionality
 """
 
+import re
 import sys
+import threading
 from pathlib import Path
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
 
+import translator as translator_module
 from translator import Translator
+from translation_cache import TranslationCache
+import numpy as np
 
 
 def test_translation():
@@ -74,6 +79,235 @@ def test_translation():
     return True
 
 
+class FakeResponse:
+    """generate_content() response carrying only text"""
+    
+    def __init__(self, text):
+        self.text = text
+
+
+class FakeGemini:
+    """
+    Stand-in for a Gemini model. Packed prompts are answered line by line
+    ("N. TEXT" upper-cased, or through reply() if given); single-text
+    prompts get "single: TEXT".
+    """
+    
+    def __init__(self, reply=None):
+        self.reply = reply
+        self.packs = []
+        self.singles = []
+    
+    def generate_content(self, prompt):
+        lines = re.findall(r'^(\d+)\. (.*)$', prompt, re.MULTILINE)
+        if 'numbered line' not in prompt:
+            text = prompt.split('\n\n', 1)[1]
+            self.singles.append(text)
+            return FakeResponse(f"single: {text}")
+        
+        self.packs.append([text for _, text in lines])
+        if self.reply:
+            return FakeResponse(self.reply(lines))
+        return FakeResponse("\n".join(f"{n}. {text.upper()}" for n, text in lines))
+
+
+def gemini_translator(model, tmp_path):
+    """Translator using a fake Gemini model and a throwaway cache"""
+    translator = Translator.__new__(Translator)
+    translator.source_lang = 'en'
+    translator.target_lang = 'vi'
+    translator.engine_type = 'gemini'
+    translator.gemini_mode = 'text'
+    translator.gemini_model = model
+    translator.translator = None
+    translator.custom_prompt = 'Translate to Vietnamese:'
+    translator.cache = TranslationCache(str(tmp_path / 'translations.db'))
+    translator._local = threading.local()
+    translator._executor = None
+    return translator
+
+
+def test_gemini_batch_is_one_request(tmp_path):
+    """Several texts go out as numbered lines of a single request"""
+    model = FakeGemini()
+    translator = gemini_translator(model, tmp_path)
+    
+    assert translator.translate_batch(['one', 'two', 'three']) == ['ONE', 'TWO', 'THREE']
+    assert model.packs == [['one', 'two', 'three']]
+    assert model.singles == []
+    translator.close()
+
+
+def test_gemini_batch_texts_with_newlines(tmp_path):
+    """A text spanning several lines is sent, and answered, as one numbered line"""
+    model = FakeGemini()
+    translator = gemini_translator(model, tmp_path)
+    
+    results = translator.translate_batch(['first line\nsecond line', 'other'])
+    
+    assert model.packs == [['first line second line', 'other']]
+    assert results == ['FIRST LINE SECOND LINE', 'OTHER']
+    translator.close()
+
+
+def test_gemini_batch_skips_empty_texts(tmp_path):
+    """Empty texts are returned as they are and not sent"""
+    model = FakeGemini()
+    translator = gemini_translator(model, tmp_path)
+    
+    results = translator.translate_batch(['', 'one', '   ', 'two'])
+    
+    assert results == ['', 'ONE', '   ', 'TWO']
+    assert model.packs == [['one', 'two']]
+    translator.close()
+
+
+def test_gemini_batch_missing_number_falls_back(tmp_path):
+    """A reply missing a line is discarded and each text translated on its own"""
+    model = FakeGemini(reply=lambda lines: "\n".join(f"{n}. {text.upper()}" for n, text in lines[:-1]))
+    translator = gemini_translator(model, tmp_path)
+    
+    results = translator.translate_batch(['one', 'two', 'three'])
+    
+    assert results == ['single: one', 'single: two', 'single: three']
+    assert sorted(model.singles) == ['one', 'three', 'two']
+    translator.close()
+
+
+def test_gemini_batch_out_of_order_falls_back(tmp_path):
+    """A reply with its lines out of order is not matched up by position"""
+    model = FakeGemini(reply=lambda lines: "\n".join(f"{n}. {text.upper()}" for n, text in reversed(lines)))
+    translator = gemini_translator(model, tmp_path)
+    
+    results = translator.translate_batch(['one', 'two'])
+    
+    assert results == ['single: one', 'single: two']
+    translator.close()
+
+
+def test_gemini_batch_splits_at_text_limit(tmp_path):
+    """More than GEMINI_PACK_SIZE texts are split over several requests"""
+    model = FakeGemini()
+    translator = gemini_translator(model, tmp_path)
+    texts = [f"text {i}" for i in range(2 * translator_module.GEMINI_PACK_SIZE + 5)]
+    
+    results = translator.translate_batch(texts)
+    
+    assert results == [text.upper() for text in texts]
+    assert sorted(len(pack) for pack in model.packs) == [5, 100, 100]
+    translator.close()
+
+
+def test_gemini_batch_splits_at_char_limit(tmp_path):
+    """A request never carries more than GEMINI_PACK_CHARS characters of text"""
+    model = FakeGemini()
+    translator = gemini_translator(model, tmp_path)
+    size = translator_module.GEMINI_PACK_CHARS // 3
+    texts = [f"{i}" + "x" * size for i in range(4)]
+    
+    results = translator.translate_batch(texts)
+    
+    assert results == [text.upper() for text in texts]
+    assert sorted(len(pack) for pack in model.packs) == [2, 2]
+    assert all(sum(map(len, pack)) <= translator_module.GEMINI_PACK_CHARS for pack in model.packs)
+    translator.close()
+
+
+class FailingGemini:
+    """Stand-in for a Gemini model over its quota"""
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def generate_content(self, prompt):
+        self.calls += 1
+        raise RuntimeError("429 Resource has been exhausted")
+
+
+def google_fallback(text):
+    """Stand-in for Google Translate, used when Gemini fails"""
+    return f"google: {text}"
+
+
+def test_gemini_failure_is_not_cached(tmp_path):
+    """A Google translation standing in for a failed Gemini call is not kept"""
+    translator = gemini_translator(FailingGemini(), tmp_path)
+    translator._translate_with_google = google_fallback
+    
+    assert translator.translate('hello') == 'google: hello'
+    
+    translator.gemini_model = FakeGemini()
+    assert translator.translate('hello') == 'single: hello'
+    translator.close()
+
+
+def test_gemini_batch_failure_is_not_cached(tmp_path):
+    """Texts a failed Gemini batch left to Google Translate are translated again later"""
+    translator = gemini_translator(FailingGemini(), tmp_path)
+    translator._translate_with_google = google_fallback
+    
+    assert translator.translate_batch(['one', 'two']) == ['google: one', 'google: two']
+    
+    translator.gemini_model = FakeGemini()
+    assert translator.translate_batch(['one', 'two']) == ['ONE', 'TWO']
+    translator.close()
+
+
+def test_gemini_vision_fallback_is_not_cached(tmp_path):
+    """A text-mode translation standing in for a failed vision call is not kept as the vision result"""
+    model = FakeGemini()
+    translator = gemini_translator(model, tmp_path)
+    translator.gemini_mode = 'vision'
+    # Fails before the image reaches Gemini, so text mode is used instead
+    image = np.zeros((0, 0, 3), dtype=np.uint8)
+    
+    assert translator.translate('hello', image=image) == 'single: hello'
+    assert translator.translate('hello', image=image) == 'single: hello'
+    assert model.singles == ['hello', 'hello']
+    translator.close()
+
+
+class RecordingSession:
+    """Stand-in for requests.Session answering like the Google Translate API"""
+    
+    def __init__(self):
+        self.requests = []
+    
+    def post(self, url, params=None, data=None, timeout=None):
+        self.requests.append({'url': url, 'params': params, 'data': data})
+        return FakeHTTPResponse([[[f"vi: {data['q']}", data['q']]]])
+
+
+class FakeHTTPResponse:
+    """requests.Response carrying only a JSON body"""
+    
+    def __init__(self, body):
+        self.body = body
+    
+    def raise_for_status(self):
+        pass
+    
+    def json(self):
+        return self.body
+
+
+def test_google_api_sends_text_in_post_body():
+    """Long texts go in the request body, not in the URL"""
+    translator = Translator.__new__(Translator)
+    translator.source_lang = 'en'
+    translator.target_lang = 'vi'
+    translator._local = threading.local()
+    session = translator._local.session = RecordingSession()
+    text = "A long scrolled page. " * 1000
+    
+    assert translator._translate_with_google_api(text) == f"vi: {text}"
+    
+    request = session.requests[0]
+    assert request['data'] == {'q': text}
+    assert 'q' not in request['params']
+    assert request['params']['sl'] == 'en' and request['params']['tl'] == 'vi'
+
+
 if __name__ == '__main__':
     success = test_translation()
     sys.exit(0 if success else 1)
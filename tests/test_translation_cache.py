@@ -0,0 +1,74 @@
+"""
+Tests for the persistent translation cache
+"""
+
+import sys
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+import translation_cache
+from translation_cache import TranslationCache
+
+
+def key(text, engine='google', source_lang='en', target_lang='vi', prompt=''):
+    """Cache key, by default of a Google en -> vi translation"""
+    return TranslationCache.make_key(text, engine, source_lang, target_lang, prompt)
+
+
+def test_memory_cache_evicts_least_recently_used(tmp_path, monkeypatch):
+    """Only MEMORY_CACHE_SIZE entries stay in memory, the oldest unused one goes first"""
+    monkeypatch.setattr(translation_cache, 'MEMORY_CACHE_SIZE', 3)
+    # A directory that cannot be created: the cache is in-memory only
+    blocker = tmp_path / 'not_a_dir'
+    blocker.write_text('')
+    cache = TranslationCache(str(blocker / 'translations.db'))
+    
+    for text in ('a', 'b', 'c'):
+        cache.put(key(text), text.upper())
+    cache.get(key('a'))  # 'b' is now the least recently used
+    cache.put(key('d'), 'D')
+    
+    assert cache.get(key('b')) is None
+    assert [cache.get(key(text)) for text in ('a', 'c', 'd')] == ['A', 'C', 'D']
+    cache.close()
+
+
+def test_evicted_entries_are_read_back_from_sqlite(tmp_path, monkeypatch):
+    """Entries dropped from memory are still found in the SQLite file"""
+    monkeypatch.setattr(translation_cache, 'MEMORY_CACHE_SIZE', 2)
+    cache = TranslationCache(str(tmp_path / 'translations.db'))
+    
+    for text in ('a', 'b', 'c'):
+        cache.put(key(text), text.upper())
+    
+    assert len(cache._memory) == 2
+    assert cache.get(key('a')) == 'A'
+    cache.close()
+
+
+def test_translations_survive_a_new_instance(tmp_path):
+    """A new cache on the same file returns translations stored by an earlier one"""
+    path = str(tmp_path / 'cache' / 'translations.db')
+    cache = TranslationCache(path)
+    cache.put(key('Hello'), 'Xin chào', 'google', 'en', 'vi')
+    cache.close()
+    
+    reopened = TranslationCache(path)
+    assert reopened.get(key('Hello')) == 'Xin chào'
+    assert reopened.get(key('Goodbye')) is None
+    reopened.close()
+
+
+def test_key_depends_on_engine_languages_and_prompt(tmp_path):
+    """A translation is only returned for the same engine, language pair and prompt"""
+    cache = TranslationCache(str(tmp_path / 'translations.db'))
+    cache.put(key('Hello'), 'Xin chào', 'google', 'en', 'vi')
+    
+    assert cache.get(key('Hello')) == 'Xin chào'
+    assert cache.get(key('Hello', engine='gemini')) is None
+    assert cache.get(key('Hello', target_lang='ja')) is None
+    assert cache.get(key('Hello', source_lang='fr')) is None
+    assert cache.get(key('Hello', engine='gemini', prompt='Translate:')) is None
+    cache.close()